@@ -26,6 +26,7 @@ import abc
 import collections
 import difflib
 import email.utils
+import functools
 import heapq
 import os
 import re
@@ -53,7 +54,7 @@ class EnvironmentNotPatched(RuntimeError):
 class EnvironmentAlreadyPatched(RuntimeError):
     pass
 
-find_unusual_characters = re.compile(
+_find_unusual_characters = re.compile(
     r'[\x00-\x08\x0B-\x1A\x1C-\x1F]'  # C0 except TAB, LF, ESC
     r'|\x1B(?!\[)'  # ESC, except when followed by [
     r'|\x7F'  # DEL
@@ -64,6 +65,57 @@ find_unusual_characters = re.compile(
     r'|(?<=\w)\xBF'  # INVERTED QUESTION MARK but only directly after a letter
 ).findall
 
+# characters that _find_unusual_characters() could possibly match:
+_search_ascii_unusual_candidate = re.compile(
+    r'[\x00-\x08\x0B-\x1F\x7F]'
+).search
+_search_unusual_candidate = re.compile(
+    r'[\x00-\x08\x0B-\x1F\x7F-\x9F\xBF\uFEFF\uFFFD-\uFFFF]'
+).search
+
+def find_unusual_characters(s, *, is_ascii=None):
+    '''
+    return list of unusual characters in the string;
+    is_ascii tells whether the string is known to be ASCII-only
+    '''
+    # The vast majority of strings don't have any candidates,
+    # and a character class search is much faster
+    # than the full regexp with alternatives and lookbehind.
+    if is_ascii is None:
+        is_ascii = misc.is_ascii(s)
+    if is_ascii:
+        if _search_ascii_unusual_candidate(s) is None:
+            return []
+    elif _search_unusual_candidate(s) is None:
+        return []
+    return _find_unusual_characters(s)
+
+StringFacts = collections.namedtuple('StringFacts', [
+    'leading_lf',
+    'trailing_lf',
+    'unusual_characters',
+    'conflict_marker',
+    'ascii',
+])
+
+def get_string_facts(s):
+    '''
+    collect facts about the string that are needed by the per-message checks
+    '''
+    conflict_marker = None
+    if '#-#-#-#-#' in s:
+        match = gettext.search_for_conflict_marker(s)
+        if match is not None:
+            conflict_marker = match.group(0)
+    is_ascii = misc.is_ascii(s)
+    return StringFacts(
+        leading_lf=s.startswith('\n'),
+        trailing_lf=s.endswith('\n'),
+        unusual_characters=frozenset(find_unusual_characters(s, is_ascii=is_ascii)),
+        conflict_marker=conflict_marker,
+        ascii=is_ascii,
+    )
+
 header_fields_with_dedicated_checks = set()
 
 def checks_header_fields(*fields):
@@ -75,6 +127,7 @@ def checks_header_fields(*fields):
 class Checker(object, metaclass=abc.ABCMeta):
 
     _patched_environment = None
+    msgid_table = None
 
     @classmethod
     def patch_environment(cls):
@@ -98,6 +151,8 @@ class Checker(object, metaclass=abc.ABCMeta):
             if path.startswith(real_root):
                 self.fake_path = fake_root + path[len(real_root):]
         self.options = options
+        if self.msgid_table is None:
+            self.msgid_table = _shared_msgid_table
         self._message_format_checkers = {
             'c': msgformat_c.Checker(self),
             'python': msgformat_python.Checker(self),
@@ -132,13 +187,10 @@ class Checker(object, metaclass=abc.ABCMeta):
         else:
             self.tag('unknown-file-type')
             return
-        broken_encoding = False
+        broken_encoding = []
         try:
-            try:
+            with encinfo.collect_decoding_errors() as broken_encoding:
                 file = constructor(self.path)
-            except UnicodeDecodeError as exc:
-                broken_encoding = exc
-                file = constructor(self.path, encoding='ISO-8859-1')
         except polib4us.moparser.SyntaxError as exc:
             self.tag('invalid-mo-file', tags.safestr(exc))
             return
@@ -167,20 +219,23 @@ class Checker(object, metaclass=abc.ABCMeta):
                 return
             raise
         finally:
-            if broken_encoding:
-                # pylint: disable=no-member
-                s = broken_encoding.object
+            [last_object, last_end] = [None, None]
+            for exc in broken_encoding:
+                s = exc.object
                 assert isinstance(s, bytes)
-                begin = max(broken_encoding.start - 40, 0)
-                end = broken_encoding.start + 40
+                if s is last_object and exc.start < last_end:
+                    # already shown in the previous tag
+                    continue
+                begin = max(exc.start - 40, 0)
+                end = exc.start + 40
+                [last_object, last_end] = [s, end]
                 s = s[begin:end]
                 self.tag('broken-encoding',
                     s,
                     tags.safestr('cannot be decoded as'),
-                    broken_encoding.encoding.upper(),
+                    exc.encoding.upper(),
                 )
-                # pylint: enable=no-member
-                broken_encoding = True
+            broken_encoding = bool(broken_encoding)
         ctx = misc.Namespace()
         ctx.file = file
         ctx.is_template = is_template
@@ -365,9 +420,10 @@ class Checker(object, metaclass=abc.ABCMeta):
         else:
             assert len(plural_forms) == 0
             plural_forms = None
-        correct_plural_forms = None
+        correct_plural_forms = correct_plural_rules = None
         if ctx.language is not None:
             correct_plural_forms = ctx.language.get_plural_forms()
+            correct_plural_rules = ctx.language.get_plural_rules()
         has_plurals = False  # messages with plural forms (translated or not)?
         expected_nplurals = {}  # number of plurals in _translated_ messages
         for message in ctx.file:
@@ -403,18 +459,16 @@ class Checker(object, metaclass=abc.ABCMeta):
             return
         if ctx.is_template:
             return
-        try:
-            (n, expr, ljunk, rjunk) = gettext.parse_plural_forms(plural_forms, strict=False)
-        except gettext.PluralFormsSyntaxError:
-            if has_plurals:
-                self.tag('syntax-error-in-plural-forms', plural_forms, '=>', plural_forms_hint)
-            else:
-                self.tag('syntax-error-in-unused-plural-forms', plural_forms, '=>', plural_forms_hint)
+        analysis = _analyze_plural_forms(
+            plural_forms,
+            correct_plural_rules,
+            plural_forms_hint,
+            has_plurals,
+        )
+        analysis.syntax_tags.replay(self)
+        if analysis.n is None:
             return
-        if ljunk:
-            self.tag('leading-junk-in-plural-forms', ljunk)
-        if rjunk:
-            self.tag('trailing-junk-in-plural-forms', rjunk)
+        n = analysis.n
         if len(expected_nplurals) == 1:
             [expected_nplurals] = expected_nplurals.keys()
             if n != expected_nplurals:
@@ -422,82 +476,8 @@ class Checker(object, metaclass=abc.ABCMeta):
                     n, tags.safestr('(Plural-Forms header field)'), '!=',
                     expected_nplurals, tags.safestr('(number of msgstr items)')
                 )
-        locally_correct_n = locally_correct_expr = None
-        if correct_plural_forms is not None:
-            locally_correct_plural_forms = [
-                (i, expression)
-                for i, expression in map(gettext.parse_plural_forms, correct_plural_forms)
-                if i == n
-            ]
-            if not locally_correct_plural_forms:
-                if has_plurals:
-                    self.tag('unusual-plural-forms', plural_forms, '=>', plural_forms_hint)
-                else:
-                    self.tag('unusual-unused-plural-forms', plural_forms, '=>', plural_forms_hint)
-            elif len(locally_correct_plural_forms) == 1:
-                [[locally_correct_n, locally_correct_expr]] = locally_correct_plural_forms
-        plural_preimage = collections.defaultdict(list)
-        unusual_plural_forms = False
-        codomain_limit = 200
-        try:
-            for i in range(codomain_limit):
-                fi = expr(i)
-                if fi >= n:
-                    message = tags.safe_format('f({}) = {} >= {}'.format(i, fi, n))
-                    if has_plurals:
-                        self.tag('codomain-error-in-plural-forms', message)
-                    else:
-                        self.tag('codomain-error-in-unused-plural-forms', message)
-                    break
-                plural_preimage[fi] += [i]
-                if (n == locally_correct_n) and (fi != locally_correct_expr(i)) and (not unusual_plural_forms):
-                    if has_plurals:
-                        self.tag('unusual-plural-forms', plural_forms, '=>', plural_forms_hint)
-                    else:
-                        self.tag('unusual-unused-plural-forms', plural_forms, '=>', plural_forms_hint)
-                    unusual_plural_forms = True
-            else:
-                ctx.plural_preimage = dict(plural_preimage)
-        except OverflowError:
-            message = tags.safe_format('f({}): integer overflow', i)
-            if has_plurals:
-                self.tag('arithmetic-error-in-plural-forms', message)
-            else:
-                self.tag('arithmetic-error-in-unused-plural-forms', message)
-        except ZeroDivisionError:
-            message = tags.safe_format('f({}): division by zero', i)
-            if has_plurals:
-                self.tag('arithmetic-error-in-plural-forms', message)
-            else:
-                self.tag('arithmetic-error-in-unused-plural-forms', message)
-        codomain = expr.codomain()
-        if codomain is not None:
-            (x, y) = codomain
-            uncov_rngs = []
-            if x > 0:
-                uncov_rngs += [range(0, x)]
-            if y + 1 < n:
-                uncov_rngs += [range(y + 1, n)]
-        if (not uncov_rngs) and (ctx.plural_preimage is not None):
-            period = expr.period()
-            if period is None:
-                period = (0, 1e999)
-            if sum(period) < codomain_limit:
-                for i in sorted(ctx.plural_preimage):
-                    if (i > 0) and (i - 1 not in ctx.plural_preimage):
-                        uncov_rngs += [range(i - 1, i)]
-                        break
-                    if (i + 1 < n) and (i + 1 not in ctx.plural_preimage):
-                        uncov_rngs += [range(i + 1, i + 2)]
-                        break
-        for rng in uncov_rngs:
-            rng = misc.format_range(rng, max=5)
-            message = tags.safestr('f(x) != {}'.format(rng))
-            if has_plurals:
-                self.tag('codomain-error-in-plural-forms', message)
-            else:
-                self.tag('codomain-error-in-unused-plural-forms', message)
-            ctx.plural_preimage = None
+        analysis.semantic_tags.replay(self)
+        ctx.plural_preimage = analysis.preimage
 
     @checks_header_fields('MIME-Version', 'Content-Transfer-Encoding', 'Content-Type')
     def check_mime(self, ctx):
@@ -537,9 +517,8 @@ class Checker(object, metaclass=abc.ABCMeta):
             match = re.search(r'(\Atext/plain; )?\bcharset=([^\s;]+)\Z', ct)
             if match:
                 encoding = match.group(2)
-                try:
-                    is_ascii_compatible = encinfo.is_ascii_compatible_encoding(encoding, missing_ok=False)
-                except encinfo.EncodingLookupError:
+                info = encinfo.get_encoding_info(encoding)
+                if info.codec is None:
                     if encoding == 'CHARSET':
                         if not ctx.is_template:
                             self.tag('boilerplate-in-content-type', ct)
@@ -547,12 +526,12 @@ class Checker(object, metaclass=abc.ABCMeta):
                         self.tag('unknown-encoding', encoding)
                     encoding = None
                 else:
-                    if not is_ascii_compatible:
+                    if not info.ascii_compatible:
                         self.tag('non-ascii-compatible-encoding', encoding)
-                    elif encinfo.is_portable_encoding(encoding):
+                    elif info.portable:
                         pass
                     else:
-                        new_encoding = encinfo.propose_portable_encoding(encoding)
+                        new_encoding = info.portable_name
                         if new_encoding is not None:
                             self.tag('non-portable-encoding', encoding, '=>', new_encoding)
                             encoding = new_encoding
@@ -789,24 +768,39 @@ class Checker(object, metaclass=abc.ABCMeta):
 
     def check_messages(self, ctx):
         found_unusual_characters = set()
-        msgid_counter = collections.Counter()
+        is_duplicate = None
+        if isinstance(ctx.file, polib.MOFile):
+            keys = (
+                _get_mo_key(message)
+                for message in ctx.file
+                if not is_header_entry(message)
+            )
+            if misc.unsorted(keys) is None:
+                is_duplicate = _SortedDuplicateDetector()
+        if is_duplicate is None:
+            keys = (
+                (message.msgid, message.msgctxt)
+                for message in ctx.file
+                if not message.obsolete and not is_header_entry(message)
+            )
+            is_duplicate = _DuplicateDetector(keys, size=len(ctx.file))
+        has_messages = False
         for message in ctx.file:
             if message.obsolete:
                 continue
             if is_header_entry(message):
                 continue
+            has_messages = True
             flags = self._check_message_flags(message)
             self._check_message_formats(ctx, message, flags)
-            msgid_counter[message.msgid, message.msgctxt] += 1
-            if msgid_counter[message.msgid, message.msgctxt] == 2:
+            if is_duplicate(message):
                 self.tag('duplicate-message-definition', message_repr(message))
             has_msgstr = bool(message.msgstr)
             has_msgstr_plural = any(message.msgstr_plural.values())
             if ctx.is_template:
                 if has_msgstr or has_msgstr_plural:
                     self.tag('translation-in-template', message_repr(message))
-            leading_lf = message.msgid.startswith('\n')
-            trailing_lf = message.msgid.endswith('\n')
+            msgid_facts = self.msgid_table.get_facts(message.msgid)
             has_previous_msgid = any(s is not None for s in [
                 message.previous_msgctxt,
                 message.previous_msgid,
@@ -814,35 +808,31 @@ class Checker(object, metaclass=abc.ABCMeta):
             ])
             if has_previous_msgid and not flags.fuzzy:
                 self.tag('stray-previous-msgid', message_repr(message))
-            strings = []
+            msgstr_facts = []
+            if has_msgstr:
+                msgstr_facts += [get_string_facts(message.msgstr)]
+            if has_msgstr_plural:
+                msgstr_facts += [
+                    get_string_facts(s)
+                    for s in misc.sorted_vk(message.msgstr_plural)
+                ]
+            facts = []
             if message.msgid_plural is not None:
-                strings += [message.msgid_plural]
+                facts += [self.msgid_table.get_facts(message.msgid_plural)]
             if not flags.fuzzy:
-                if has_msgstr:
-                    strings += [message.msgstr]
-                if has_msgstr_plural:
-                    strings += message.msgstr_plural.values()  # the order doesn't matter here
-            for s in strings:
-                if s.startswith('\n') != leading_lf:
+                facts += msgstr_facts
+            for f in facts:
+                if f.leading_lf != msgid_facts.leading_lf:
                     self.tag('inconsistent-leading-newlines', message_repr(message))
                     break
-            for s in strings:
-                if s.endswith('\n') != trailing_lf:
+            for f in facts:
+                if f.trailing_lf != msgid_facts.trailing_lf:
                     self.tag('inconsistent-trailing-newlines', message_repr(message))
                     break
-            strings = []
-            if has_msgstr:
-                strings += [message.msgstr]
-            if has_msgstr_plural:
-                strings += misc.sorted_vk(message.msgstr_plural)
             if ctx.encoding is not None:
-                msgid_uc = (
-                    set(find_unusual_characters(message.msgid)) |
-                    set(find_unusual_characters(message.msgid_plural or ''))
-                )
-                for msgstr in strings:
-                    msgstr_uc = set(find_unusual_characters(msgstr))
-                    uc = msgstr_uc - msgid_uc - found_unusual_characters
+                msgid_uc = self.msgid_table.get_unusual_characters(message)
+                for f in msgstr_facts:
+                    uc = f.unusual_characters - msgid_uc - found_unusual_characters
                     if not uc:
                         continue
                     names = ', '.join(
@@ -855,15 +845,13 @@ class Checker(object, metaclass=abc.ABCMeta):
                     )
                     found_unusual_characters |= uc
             if not flags.fuzzy:
-                for msgstr in strings:
-                    conflict_marker = gettext.search_for_conflict_marker(msgstr)
-                    if conflict_marker is not None:
-                        conflict_marker = conflict_marker.group(0)
-                        self.tag('conflict-marker-in-translation', message_repr(message), conflict_marker)
+                for f in msgstr_facts:
+                    if f.conflict_marker is not None:
+                        self.tag('conflict-marker-in-translation', message_repr(message), f.conflict_marker)
                         break
                 if has_msgstr_plural and not all(message.msgstr_plural.values()):
                     self.tag('partially-translated-message', message_repr(message))
-        if len(msgid_counter) == 0:
+        if not has_messages:
             possible_hidden_strings = False
             if isinstance(ctx.file, polib.MOFile):
                 possible_hidden_strings = ctx.file.possible_hidden_strings
@@ -1001,11 +989,10 @@ class Checker(object, metaclass=abc.ABCMeta):
         if ctx.encoding is None:
             return
         prefix = message_repr(message, template='{}:')
-        try:
-            xml.check_fragment(message.msgid)
-        except xml.SyntaxError as exc:
+        msgid_error = self.msgid_table.get_xml_error(message.msgid)
+        if msgid_error is not None:
             if ctx.is_template:
-                self.tag('malformed-xml', prefix, tags.safestr(exc))
+                self.tag('malformed-xml', prefix, tags.safestr(msgid_error))
             return
         if flags.fuzzy:
             return
@@ -1016,7 +1003,261 @@ class Checker(object, metaclass=abc.ABCMeta):
         except xml.SyntaxError as exc:
             self.tag('malformed-xml', prefix, tags.safestr(exc))
 
-__all__ = ['Checker']
+__all__ = [
+    'Checker',
+    'MsgidTable',
+]
+
+class _TagRecorder(object):
+
+    '''
+    record tags, so that they can be emitted later
+    '''
+
+    def __init__(self):
+        self._tags = []
+
+    def tag(self, tagname, *extra):
+        self._tags += [(tagname, extra)]
+
+    def replay(self, checker):
+        for tagname, extra in self._tags:
+            checker.tag(tagname, *extra)
+
+def _get_mo_key(message):
+    '''
+    return the key the message is sorted by in MO files
+    '''
+    if message.msgctxt is None:
+        return message.msgid
+    return message.msgctxt + '\x04' + message.msgid
+
+class _DuplicateDetector(object):
+
+    '''
+    detect the second definition of the same message
+
+    The keys are first counted in a compact table indexed by their hashes.
+    Only keys that fall into a slot hit more than once need to be counted
+    exactly.
+    '''
+
+    def __init__(self, keys, *, size):
+        self._size = n = 8 * size + 1
+        self._table = table = bytearray(n)
+        for key in keys:
+            i = hash(key) % n
+            if table[i] < 2:
+                table[i] += 1
+        self._counter = collections.Counter()
+
+    def __call__(self, message):
+        key = (message.msgid, message.msgctxt)
+        if self._table[hash(key) % self._size] < 2:
+            return False
+        self._counter[key] += 1
+        return self._counter[key] == 2
+
+class _SortedDuplicateDetector(object):
+
+    '''
+    detect the second definition of the same message
+    in sorted MO files, where duplicates are adjacent
+    '''
+
+    def __init__(self):
+        self._last_key = None
+        self._count = 0
+
+    def __call__(self, message):
+        key = _get_mo_key(message)
+        if key == self._last_key:
+            self._count += 1
+            return self._count == 2
+        self._last_key = key
+        self._count = 1
+        return False
+
+class MsgidTable(object):
+
+    '''
+    msgid-side analysis results,
+    which can be shared between a template and its translations;
+    if maxsize is not None, only that many least recently used results
+    of each kind are kept
+    '''
+
+    def __init__(self, *, maxsize=None):
+        self._maxsize = maxsize
+        self._facts = collections.OrderedDict()
+        self._xml_errors = collections.OrderedDict()
+
+    def _lookup(self, cache, s, fn):
+        try:
+            result = cache[s]
+        except KeyError:
+            pass
+        else:
+            if self._maxsize is not None:
+                cache.move_to_end(s)
+            return result
+        result = cache[s] = fn(s)
+        if self._maxsize is not None and len(cache) > self._maxsize:
+            cache.popitem(last=False)
+        return result
+
+    def get_facts(self, s):
+        return self._lookup(self._facts, s, get_string_facts)
+
+    def get_unusual_characters(self, message):
+        result = self.get_facts(message.msgid).unusual_characters
+        if message.msgid_plural is not None:
+            result |= self.get_facts(message.msgid_plural).unusual_characters
+        return result
+
+    def get_xml_error(self, s):
+        '''
+        return the error message if s is not a well-formed XML fragment;
+        return None otherwise
+        '''
+        return self._lookup(self._xml_errors, s, _get_xml_error)
+
+def _get_xml_error(s):
+    try:
+        xml.check_fragment(s)
+    except xml.SyntaxError as exc:
+        return str(exc)
+    return None
+
+# The same msgids occur in every file of a domain, whatever the language,
+# so keep their analysis around, even outside the project mode:
+_shared_msgid_table = MsgidTable(maxsize=(1 << 14))
+
+# Limits for plural expressions, so that hostile ones can't make the
+# evaluators hit the recursion limit, or take too much time:
+_plural_expression_max_depth = 100
+_plural_expression_budget = 200000  # number of nodes × number of values
+
+@functools.lru_cache(maxsize=256)
+def _analyze_plural_forms(plural_forms, correct_plural_rules, plural_forms_hint, has_plurals):
+    '''
+    analyze the Plural-Forms header field;
+    the result depends only on the arguments,
+    so it can be shared between files
+    '''
+    result = misc.Namespace()
+    result.n = None
+    result.syntax_tags = syntax_tags = _TagRecorder()
+    result.semantic_tags = semantic_tags = _TagRecorder()
+    result.preimage = None
+    codomain_limit = ling.plural_rule_values_limit
+    try:
+        (n, expr, ljunk, rjunk) = gettext.parse_plural_forms(plural_forms, strict=False)
+    except gettext.PluralExpressionComplexityError:
+        message = tags.safestr('expression nested too deeply')
+        if has_plurals:
+            syntax_tags.tag('too-complex-plural-forms', message)
+        else:
+            syntax_tags.tag('too-complex-unused-plural-forms', message)
+        return result
+    except gettext.PluralFormsSyntaxError:
+        if has_plurals:
+            syntax_tags.tag('syntax-error-in-plural-forms', plural_forms, '=>', plural_forms_hint)
+        else:
+            syntax_tags.tag('syntax-error-in-unused-plural-forms', plural_forms, '=>', plural_forms_hint)
+        return result
+    if ljunk:
+        syntax_tags.tag('leading-junk-in-plural-forms', ljunk)
+    if rjunk:
+        syntax_tags.tag('trailing-junk-in-plural-forms', rjunk)
+    result.n = n
+    complexity = expr.complexity()
+    message = None
+    if complexity.depth > _plural_expression_max_depth:
+        message = tags.safe_format('depth {} > {}', complexity.depth, _plural_expression_max_depth)
+    elif complexity.nodes * codomain_limit > _plural_expression_budget:
+        message = tags.safe_format('{} nodes > {}', complexity.nodes, _plural_expression_budget // codomain_limit)
+    if message is not None:
+        if has_plurals:
+            semantic_tags.tag('too-complex-plural-forms', message)
+        else:
+            semantic_tags.tag('too-complex-unused-plural-forms', message)
+        return result
+    locally_correct_rules = ()
+    if correct_plural_rules is not None:
+        locally_correct_rules = correct_plural_rules[n]
+        if not locally_correct_rules:
+            if has_plurals:
+                semantic_tags.tag('unusual-plural-forms', plural_forms, '=>', plural_forms_hint)
+            else:
+                semantic_tags.tag('unusual-unused-plural-forms', plural_forms, '=>', plural_forms_hint)
+    evaluation = expr.evaluate_range(0, codomain_limit)
+    values = evaluation.values
+    # the first n for which f(n) is out of range:
+    bad_n = next((i for i, fi in enumerate(values) if fi >= n), None)
+    if bad_n is not None:
+        values = values[:bad_n]
+    if locally_correct_rules:
+        fingerprint = None
+        if bad_n is None:
+            fingerprint = expr.fingerprint(limit=codomain_limit)
+        if fingerprint is not None and all(rule.fingerprint is not None for rule in locally_correct_rules):
+            languages = ling.get_language_codes_for_plural_rule(n, fingerprint)
+            unusual = correct_plural_rules.language not in languages
+        else:
+            unusual = not any(
+                values[:len(rule.values)] == rule.values[:len(values)]
+                for rule in locally_correct_rules
+            )
+        if unusual:
+            if has_plurals:
+                semantic_tags.tag('unusual-plural-forms', plural_forms, '=>', plural_forms_hint)
+            else:
+                semantic_tags.tag('unusual-unused-plural-forms', plural_forms, '=>', plural_forms_hint)
+    if bad_n is not None:
+        message = tags.safe_format('f({}) = {} >= {}'.format(bad_n, evaluation.values[bad_n], n))
+        if has_plurals:
+            semantic_tags.tag('codomain-error-in-plural-forms', message)
+        else:
+            semantic_tags.tag('codomain-error-in-unused-plural-forms', message)
+    elif evaluation.error is not None:
+        (i, exc) = evaluation.error
+        if isinstance(exc, OverflowError):
+            message = tags.safe_format('f({}): integer overflow', i)
+        else:
+            message = tags.safe_format('f({}): division by zero', i)
+        if has_plurals:
+            semantic_tags.tag('arithmetic-error-in-plural-forms', message)
+        else:
+            semantic_tags.tag('arithmetic-error-in-unused-plural-forms', message)
+    else:
+        result.preimage = expr.preimage(limit=codomain_limit)
+    codomain = expr.codomain()
+    if codomain is not None:
+        (x, y) = codomain
+        uncov_rngs = []
+        if x > 0:
+            uncov_rngs += [range(0, x)]
+        if y + 1 < n:
+            uncov_rngs += [range(y + 1, n)]
+    if (not uncov_rngs) and (result.preimage is not None) and result.preimage.complete:
+        preimage = result.preimage.ranges
+        for i in sorted(preimage):
+            if (i > 0) and (i - 1 not in preimage):
+                uncov_rngs += [range(i - 1, i)]
+                break
+            if (i + 1 < n) and (i + 1 not in preimage):
+                uncov_rngs += [range(i + 1, i + 2)]
+                break
+    for rng in uncov_rngs:
+        rng = misc.format_range(rng, max=5)
+        message = tags.safestr('f(x) != {}'.format(rng))
+        if has_plurals:
+            semantic_tags.tag('codomain-error-in-plural-forms', message)
+        else:
+            semantic_tags.tag('codomain-error-in-unused-plural-forms', message)
+        result.preimage = None
+    return result
 
 def is_header_entry(entry):
     return (
@@ -23,9 +23,21 @@ message format checks
 '''
 
 import abc
+import heapq
+import itertools
 
 from lib import misc
 
+def _clip_range(rng, lo, hi):
+    '''
+    return range of the elements of rng that are in [lo, hi]
+    '''
+    i = max(0, -((rng.start - lo) // rng.step))
+    j = len(rng)
+    if j and hi < rng[-1]:
+        j = max(0, (int(hi) - rng.start) // rng.step + 1)
+    return rng[i:j]
+
 class Checker(object, metaclass=abc.ABCMeta):
 
     def __init__(self, parent):
@@ -48,7 +60,7 @@ class Checker(object, metaclass=abc.ABCMeta):
                 fmt = self.check_string(ctx, message, s)
             else:
                 try:
-                    fmt = self.backend.FormatString(s)
+                    fmt = self.backend.parse(s)
                 except self.backend.Error:
                     # If msgid isn't even a valid format string, then
                     # reporting errors against msgstr is not worth the trouble.
@@ -91,14 +103,16 @@ class Checker(object, metaclass=abc.ABCMeta):
                 if d.dst_fmt is None:
                     continue
                 try:
-                    preimage = ctx.plural_preimage[i]
+                    preimage = ctx.plural_preimage.ranges[i]
                 except KeyError:
                     # broken plural forms
                     continue
-                preimage = [
-                    x for x in preimage
-                    if flags.range_min <= x <= flags.range_max
-                ]
+                preimage = (
+                    _clip_range(rng, flags.range_min, flags.range_max)
+                    for rng in preimage
+                )
+                # the three smallest n are enough for the checks below:
+                preimage = list(itertools.islice(heapq.merge(*preimage), 3))
                 # XXX In theory, the msgstr[] corresponding to n=1 should
                 # not have more arguments than msgid. In practice, it's not
                 # uncommon to see something like this:
@@ -119,9 +133,10 @@ class Checker(object, metaclass=abc.ABCMeta):
                 #
                 # See also: https://bugs.debian.org/753946
                 if preimage == [1]:
-                    # FIXME: “preimage” is not necessarily complete.
-                    # So it's theoretically possible that this msgstr[]
-                    # corresponds to both n=1 and another n.
+                    # FIXME: “preimage” is not complete if the period of
+                    # the plural expression is unknown or too long.
+                    # In that case it's theoretically possible that this
+                    # msgstr[] corresponds to both n=1 and another n.
                     d.src_loc = 'msgid'
                     d.src_fmt = msgid_fmt
                     d.omitted_int_conv_ok = (
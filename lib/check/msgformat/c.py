@@ -47,7 +47,7 @@ class Checker(CheckerBase):
         prefix = message_repr(message, template='{}:')
         fmt = None
         try:
-            fmt = backend.FormatString(s)
+            fmt = backend.parse_uncached(s)
         except backend.MissingArgument as exc:
             self.tag('c-format-string-error',
                 prefix,
@@ -37,7 +37,7 @@ class Checker(CheckerBase):
         prefix = message_repr(message, template='{}:')
         fmt = None
         try:
-            fmt = backend.FormatString(s)
+            fmt = backend.parse_uncached(s)
         except backend.Error as exc:
             self.tag('python-brace-format-string-error',
                 prefix,
@@ -37,7 +37,7 @@ class Checker(CheckerBase):
         prefix = message_repr(message, template='{}:')
         fmt = None
         try:
-            fmt = backend.FormatString(s)
+            fmt = backend.parse_uncached(s)
         except backend.ArgumentTypeMismatch as exc:
             [s, key, types] = exc.args  # pylint: disable=unbalanced-tuple-unpacking
             self.tag('python-format-string-error',
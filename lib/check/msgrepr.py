@@ -24,7 +24,7 @@ string representation of messages
 
 from lib import tags
 
-def message_repr(message, template='{}'):
+def _message_repr(message, template):
     subtemplate = 'msgid {id}'
     kwargs = dict(id=message.msgid)
     if message.msgctxt is not None:
@@ -33,6 +33,11 @@ def message_repr(message, template='{}'):
     template = template.format(subtemplate)
     return tags.safe_format(template, **kwargs)
 
+def message_repr(message, template='{}'):
+    # Most messages don't trigger any tags,
+    # so don't format anything until it's really needed:
+    return tags.lazy_safestr(_message_repr, message, template)
+
 __all__ = ['message_repr']
 
 # vim:ts=4 sts=4 sw=4 et
@@ -119,10 +119,12 @@ def check_file(path, *, options):
             pass
     return check_regular_file(path, options=options)
 
-def check_file_s(path, *, options):
+def check_file_s(path, *, options, msgid_table=None):
     '''
     check_file() with captured stdout
     '''
+    if msgid_table is not None:
+        Checker.msgid_table = msgid_table
     orig_stdout = sys.stdout
     sys.stdout = io_stdout = io.StringIO()
     try:
@@ -138,10 +140,44 @@ def check_all(paths, *, options):
     else:
         executor = concurrent.futures.ProcessPoolExecutor(max_workers=options.jobs)
         with executor:
-            check_file_opt = functools.partial(check_file_s, options=options)
+            check_file_opt = functools.partial(check_file_s,
+                options=options,
+                msgid_table=Checker.msgid_table,
+            )
             for s in executor.map(check_file_opt, paths):
                 sys.stdout.write(s)
 
+def find_project_files(directory):
+    '''
+    return (templates, translations) found in the directory
+    '''
+    templates = []
+    translations = []
+    for filename in sorted(os.listdir(directory)):
+        path = os.path.join(directory, filename)
+        if not os.path.isfile(path):
+            continue
+        extension = os.path.splitext(filename)[-1]
+        if extension == '.pot':
+            templates += [path]
+        elif extension == '.po':
+            translations += [path]
+    return (templates, translations)
+
+def check_project(directory, *, options):
+    '''
+    check templates in the directory first,
+    so that msgid-side analysis is shared with all the translations
+    '''
+    (templates, translations) = find_project_files(directory)
+    Checker.msgid_table = check.MsgidTable()
+    try:
+        for path in templates:
+            check_file(path, options=options)
+        check_all(translations, options=options)
+    finally:
+        Checker.msgid_table = None
+
 def parse_jobs(s):
     if s == 'auto':
         try:
@@ -168,23 +204,6 @@ class VersionAction(argparse.Action):
         print('{prog} {0}'.format(__version__, prog=parser.prog))
         print('+ Python {0}.{1}.{2}'.format(*sys.version_info))
         print('+ polib {0}'.format(check.polib.__version__))
-        rply = check.gettext.intexpr.rply
-        try:
-            rply_version = rply.__version__
-        except AttributeError:
-            # __version__ is available only since rply 0.7.4+:
-            # https://github.com/alex/rply/pull/58
-            try:
-                import pkg_resources
-                [dist, *rest] = pkg_resources.require('rply')
-                del rest
-                assert dist.project_name == 'rply'
-                rply_version = dist.version
-            except ImportError:
-                # oh well...
-                rply_version = None
-        if rply_version is not None:
-            print('+ rply {0}'.format(rply_version))
         parser.exit()
 
 def main():
@@ -197,10 +216,20 @@ def main():
     ap.add_argument('--parallel', type=int, metavar='<n>', default=None, help=argparse.SUPPRESS)  # renamed as -j/--jobs in 0.25
     ap.add_argument('--file-type', metavar='<file-type>', help=argparse.SUPPRESS)
     ap.add_argument('--traceback', action='store_true', help=argparse.SUPPRESS)
-    ap.add_argument('files', metavar='<file>', nargs='+')
+    ap.add_argument('--project', metavar='<dir>', help='check template and translations in <dir> together')
+    ap.add_argument('files', metavar='<file>', nargs='*')
     options = ap.parse_args()
     files = options.files
     del options.files
+    project = options.project
+    del options.project
+    if not files and project is None:
+        ap.error('the following arguments are required: <file>')
+    if project is not None:
+        if files:
+            ap.error('--project cannot be used together with <file> arguments')
+        if not os.path.isdir(project):
+            ap.error('{dir}: not a directory'.format(dir=project))
     pathmod.check()
     if options.language is not None:
         try:
@@ -222,7 +251,10 @@ def main():
     options.ignore_tags = set()
     options.fake_root = None
     Checker.patch_environment()
-    check_all(files, options=options)
+    if project is not None:
+        check_project(project, options=options)
+    else:
+        check_all(files, options=options)
 
 __all__ = ['main']
 
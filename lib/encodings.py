@@ -23,8 +23,11 @@
 - codecs for unusual encodings
 '''
 
+import bisect
 import codecs
+import collections
 import configparser
+import contextlib
 import encodings.aliases as encoding_aliases
 import errno
 import functools
@@ -45,36 +48,72 @@ def _not_implemented(*args, **kwargs):  # no coverage
     del args, kwargs
     raise NotImplementedError
 
-def charmap_encoding(encoding):
-
-    def encode(input, errors='strict'):
-        return codecs.charmap_encode(input, errors, encoding_table)
-
-    def decode(input, errors='strict'):
-        return codecs.charmap_decode(input, errors, decoding_table)
-
-    path = os.path.join(paths.datadir, 'charmaps', encoding.upper())
+@functools.lru_cache(maxsize=None)
+def _get_charmap_tables(encoding):
+    path = os.path.join(paths.datadir, 'charmaps', encoding)
     try:
         file = open(path, 'rb')
     except IOError as exc:
         if exc.errno == errno.ENOENT:
-            raise EncodingLookupError(encoding)
+            return
         raise
     with file:
         decoding_table = file.read()
     decoding_table = decoding_table.decode('UTF-8')
     encoding_table = codecs.charmap_build(decoding_table)
+    return (decoding_table, encoding_table)
+
+def charmap_encoding(encoding):
+
+    def encode(input, errors='strict'):
+        return codecs.charmap_encode(input, errors, encoding_table)
+
+    def decode(input, errors='strict'):
+        return codecs.charmap_decode(input, errors, decoding_table)
+
+    class IncrementalDecoder(codecs.IncrementalDecoder):
+
+        def decode(self, input, final=False):
+            return codecs.charmap_decode(input, self.errors, decoding_table)[0]
+
+    class StreamReader(codecs.StreamReader):
+
+        def decode(self, input, errors='strict'):
+            return codecs.charmap_decode(input, errors, decoding_table)
+
+    tables = _get_charmap_tables(encoding.upper())
+    if tables is None:
+        raise EncodingLookupError(encoding)
+    [decoding_table, encoding_table] = tables
 
     return codecs.CodecInfo(
         encode=encode,
         decode=decode,
-        streamreader=_not_implemented,
+        streamreader=StreamReader,
         streamwriter=_not_implemented,
         incrementalencoder=_not_implemented,
-        incrementaldecoder=_not_implemented,
+        incrementaldecoder=IncrementalDecoder,
         name=encoding,
     )
 
+class _EOFTrackingStream(object):
+
+    '''
+    stream wrapper that remembers whether the last read hit the end of the stream
+    '''
+
+    def __init__(self, stream):
+        self._stream = stream
+        self.eof = False
+
+    def read(self, *args):
+        data = self._stream.read(*args)
+        self.eof = not data
+        return data
+
+    def __getattr__(self, attr):
+        return getattr(self._stream, attr)
+
 def iconv_encoding(encoding):
 
     def encode(input, errors='strict'):
@@ -85,16 +124,76 @@ def iconv_encoding(encoding):
         output = iconv.decode(bytes(input), encoding=encoding, errors=errors)
         return output, len(input)
 
+    # Every call to iconv starts in the initial shift state, so only
+    # incomplete multibyte sequences are carried over between chunks.
+    # This is fine for stateless encodings, such as EUC-TW.
+
+    class IncrementalDecoder(codecs.BufferedIncrementalDecoder):
+
+        def _buffer_decode(self, input, errors, final):
+            input = bytes(input)
+            if final:
+                return decode(input, errors)
+            return iconv.decode_partial(input, encoding=encoding, errors=errors)
+
+    class StreamReader(codecs.StreamReader):
+
+        def __init__(self, stream, errors='strict'):
+            super().__init__(_EOFTrackingStream(stream), errors)
+
+        def decode(self, input, errors='strict'):
+            input = bytes(input)
+            if self.stream.eof:
+                # The stream is exhausted, so an incomplete multibyte
+                # sequence at the end is an error, not something to wait for.
+                return decode(input, errors)
+            return iconv.decode_partial(input, encoding=encoding, errors=errors)
+
     return codecs.CodecInfo(
         encode=encode,
         decode=decode,
-        streamreader=_not_implemented,
+        streamreader=StreamReader,
         streamwriter=_not_implemented,
         incrementalencoder=_not_implemented,
-        incrementaldecoder=_not_implemented,
+        incrementaldecoder=IncrementalDecoder,
         name=encoding,
     )
 
+_decoding_error_logs = []
+
+def record_decoding_error(exc):
+    _decoding_error_logs[-1] += [exc]
+
+def _collect_decoding_error(exc):
+    # The exception object may be reused by the decoder, so make a copy.
+    record_decoding_error(
+        UnicodeDecodeError(exc.encoding, exc.object, exc.start, exc.end, exc.reason)
+    )
+    replacement = exc.object[exc.start:exc.end].decode('ISO-8859-1')
+    return (replacement, exc.end)
+
+codecs.register_error('i18nspector-collect', _collect_decoding_error)
+
+@contextlib.contextmanager
+def collect_decoding_errors():
+    '''
+    record decoding errors, instead of raising them,
+    for decoders that use get_decoding_error_handler();
+    the offending bytes are decoded as ISO-8859-1
+    '''
+    log = []
+    _decoding_error_logs.append(log)
+    try:
+        yield log
+    finally:
+        _decoding_error_logs.pop()
+
+def get_decoding_error_handler():
+    if _decoding_error_logs:
+        return 'i18nspector-collect'
+    else:
+        return 'strict'
+
 _interesting_ascii_bytes = bytes(itertools.chain([
     0,  # NUL
     4,  # EOT
@@ -160,10 +259,14 @@ def get_portable_encodings(python=True):
         if (not python) or (codec is not None)
     )
 
-def is_portable_encoding(encoding, python=True):
+def _normalize_encoding_name(encoding):
     encoding = encoding.lower()
     if encoding.startswith('iso_'):
         encoding = 'iso-' + encoding[4:]
+    return encoding
+
+def is_portable_encoding(encoding, python=True):
+    encoding = _normalize_encoding_name(encoding)
     if python:
         return _portable_encodings.get(encoding, None) is not None
     else:
@@ -197,7 +300,95 @@ def is_ascii_compatible_encoding(encoding, *, missing_ok=True):
     else:
         raise EncodingLookupError(encoding)
 
-def _codec_search_function(encoding):
+EncodingInfo = collections.namedtuple('EncodingInfo', [
+    'name',  # the encoding name, as passed to get_encoding_info()
+    'codec',  # CodecInfo, or None if the encoding is unknown
+    'ascii_compatible',
+    'portable',  # portable and supported by Python
+    'portable_name',  # proposed portable name, or None
+])
+
+@functools.lru_cache(maxsize=256)
+def get_encoding_info(encoding):
+    '''
+    return EncodingInfo for the encoding
+    '''
+    try:
+        ascii_compatible = is_ascii_compatible_encoding(encoding, missing_ok=False)
+    except EncodingLookupError:
+        codec = None
+        ascii_compatible = False
+    else:
+        codec = codecs.lookup(encoding)
+    portable = is_portable_encoding(encoding)
+    if codec is None or portable:
+        portable_name = None
+    else:
+        portable_name = propose_portable_encoding(encoding)
+    return EncodingInfo(
+        name=encoding,
+        codec=codec,
+        ascii_compatible=ascii_compatible,
+        portable=portable,
+        portable_name=portable_name,
+    )
+
+class CharacterCoverage(object):
+
+    '''
+    precomputed information about characters representable in an encoding
+    '''
+
+    def __init__(self, s):
+        self._begins = []
+        self._ends = []
+        self._statuses = []
+        for item in s.split():
+            status = not item.startswith('!')
+            item = item.lstrip('!')
+            begin, _, end = item.partition('-')
+            begin = int(begin, 16)
+            end = int(end, 16) if end else begin
+            if self._ends and begin <= self._ends[-1]:
+                raise misc.DataIntegrityError
+            self._begins += [begin]
+            self._ends += [end]
+            self._statuses += [status]
+
+    def is_representable(self, s):
+        '''
+        check if every character of the string is representable in the encoding;
+        raise KeyError if the coverage information is not available
+        '''
+        for ch in s:
+            cp = ord(ch)
+            i = bisect.bisect_right(self._begins, cp) - 1
+            if i < 0 or cp > self._ends[i]:
+                raise KeyError(ch)
+            if not self._statuses[i]:
+                return False
+        return True
+
+@functools.lru_cache(maxsize=1)
+def _read_coverage():
+    path = os.path.join(paths.datadir, 'coverage')
+    cp = configparser.ConfigParser(interpolation=None, default_section='')
+    cp.read(path, encoding='ASCII')
+    return dict(cp['coverage'].items())
+
+@functools.lru_cache(maxsize=None)
+def get_character_coverage(encoding):
+    '''
+    return CharacterCoverage for the encoding, or None
+    '''
+    encoding = _normalize_encoding_name(encoding)
+    s = _read_coverage().get(encoding)
+    if s is None:
+        return
+    return CharacterCoverage(s)
+
+@functools.lru_cache(maxsize=None)
+def _get_extra_codec(encoding):
     if _portable_encodings.get(encoding, False) is None:
         # portable according to gettext documentation
         # but not supported directly by Python
@@ -212,9 +403,16 @@ def _codec_search_function(encoding):
     except EncodingLookupError:
         return iconv_encoding(encoding)
 
+def _codec_search_function(encoding):
+    # Python >= 3.9 normalizes hyphens to underscores before calling search
+    # functions; none of the extra encodings have underscores in their names.
+    encoding = _normalize_encoding_name(encoding).replace('_', '-')
+    return _get_extra_codec(encoding)
+
 @functools.lru_cache(maxsize=1)
 def install_extra_encodings():
     codecs.register(_codec_search_function)
+    get_encoding_info.cache_clear()
     for enc_name in _portable_encodings:
         if enc_name.startswith('iso-'):
             suffix = enc_name[4:].replace('-', '_')
@@ -85,10 +85,15 @@ class PluralFormsSyntaxError(Exception):
 class PluralExpressionSyntaxError(PluralFormsSyntaxError):
     pass
 
+class PluralExpressionComplexityError(PluralFormsSyntaxError):
+    pass
+
 def parse_plural_expression(s):
     parser = intexpr.Parser()
     try:
         return parser.parse(s)
+    except intexpr.ComplexityError:
+        raise PluralExpressionComplexityError
     except intexpr.LexingError:
         raise PluralExpressionSyntaxError
     except intexpr.ParsingError:
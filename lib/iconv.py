@@ -22,6 +22,7 @@
 string encoding and decoding using iconv(3), with a fallback to iconv(1)
 '''
 
+import codecs
 import ctypes
 import errno
 import os
@@ -160,88 +161,150 @@ def decode(input: bytes, encoding=default_encoding, errors='strict'):
     if len(input) == 0:
         return ''
     if errors != 'strict':
-        raise NotImplementedError('error handler {e!r} is not implemented'.format(e=errors))
-    return _decode(input, encoding=encoding)
+        codecs.lookup_error(errors)
+    (output, consumed) = _decode(input, encoding=encoding, errors=errors, final=True)
+    assert consumed == len(input)
+    return output
 
-def _decode_dl(input: bytes, *, encoding):
+def decode_partial(input: bytes, encoding=default_encoding, errors='strict'):
+    '''
+    decode as much of the input as possible,
+    leaving out an incomplete multibyte sequence at the end;
+    return (output, number of bytes consumed)
+    '''
+    if not isinstance(input, bytes):
+        raise TypeError('input must be bytes, not {tp}'.format(tp=type(input).__name__))
+    if not isinstance(encoding, str):
+        raise TypeError('encoding must be str, not {tp}'.format(tp=type(encoding).__name__))
+    if not isinstance(errors, str):
+        raise TypeError('errors must be str, not {tp}'.format(tp=type(errors).__name__))
+    if len(input) == 0:
+        return ('', 0)
+    if errors != 'strict':
+        codecs.lookup_error(errors)
+    return _decode(input, encoding=encoding, errors=errors, final=False)
+
+# Assume that the encoding can be synchronized on ASCII characters.
+# That's not necessarily true for _every_ encoding, but oh well.
+_find_sync_point = re.compile(b'[\x00-\x7F]').search
+
+def _decode_dl(input: bytes, *, encoding, errors, final):
     cd = _iconv_open(b'WCHAR_T', bytes(encoding, 'ASCII'))
     assert isinstance(cd, int)
     if cd == ctypes.c_void_p(-1).value:
         rc = ctypes.get_errno()
         raise OSError(rc, os.strerror(rc))
     try:
-        c_input = ctypes.c_char_p(input)
-        output_len = len(input)
-        while True:
-            inbuf = ctypes.cast(c_input, ctypes.POINTER(ctypes.c_char))
-            inbytesleft = ctypes.c_size_t(len(input))
-            assert inbytesleft.value == len(input)  # no overflow
-            outbuf = ctypes.create_unicode_buffer(output_len)
-            outbytesleft = ctypes.c_size_t(output_len)  # no overflow
-            assert outbytesleft.value == output_len
-            rc = _iconv(cd, None, None, None, None)
-            if rc == ctypes.c_size_t(-1).value:
-                rc = ctypes.get_errno()
-                raise OSError(rc, os.strerror(rc))
-            inbufptr = ctypes.pointer(ctypes.cast(inbuf, ctypes.POINTER(ctypes.c_char)))
-            outbufptr = ctypes.pointer(ctypes.cast(outbuf, ctypes.POINTER(ctypes.c_char)))
-            rc = _iconv(cd,
-                inbufptr, ctypes.byref(inbytesleft),
-                outbufptr, ctypes.byref(outbytesleft),
+        c_input = ctypes.create_string_buffer(input, len(input))
+        output = []
+        begin = 0
+        while begin < len(input):
+            (s, begin, rc) = _decode_dl_step(cd, c_input, begin)
+            output += [s]
+            if rc == 0:
+                break
+            if rc == errno.EINVAL and not final:
+                # incomplete multibyte sequence at the end of input
+                break
+            match = _find_sync_point(input, begin + 1)
+            end = match.start() if match else len(input)
+            exc = UnicodeDecodeError(
+                encoding,
+                input,
+                begin, end,
+                os.strerror(errno.EILSEQ),
             )
-            if rc != ctypes.c_size_t(-1).value:
-                rc = _iconv(cd,
-                    None, None,
-                    outbufptr, ctypes.byref(outbytesleft),
-                )
-            if rc == ctypes.c_size_t(-1).value:
-                rc = ctypes.get_errno()
-                if rc == errno.E2BIG:
-                    output_len *= 2
-                    continue
-                elif rc in {errno.EILSEQ, errno.EINVAL}:
-                    begin = len(input) - inbytesleft.value
-                    for end in range(begin + 1, len(input)):
-                        # Assume that the encoding can be synchronized on ASCII characters.
-                        # That's not necessarily true for _every_ encoding, but oh well.
-                        if input[end] < 0x80:
-                            break
-                    else:
-                        end = len(input)
-                    raise UnicodeDecodeError(
-                        encoding,
-                        input,
-                        begin, end,
-                        os.strerror(errno.EILSEQ),
-                    )
-                raise OSError(rc, os.strerror(rc))
-            assert inbytesleft.value == 0, '{n} bytes left'.format(n=inbytesleft.value)
-            output_len -= outbytesleft.value
-            assert output_len % ctypes.sizeof(ctypes.c_wchar) == 0
-            unicode_output_len = output_len // ctypes.sizeof(ctypes.c_wchar)
-            return outbuf[:unicode_output_len]
+            if errors == 'strict':
+                raise exc
+            (replacement, begin) = codecs.lookup_error(errors)(exc)
+            output += [replacement]
+            if begin < 0:
+                begin += len(input)
+        return (''.join(output), begin)
     finally:
         rc = _iconv_close(cd)
         if rc != 0:
             rc = ctypes.get_errno()
             raise OSError(rc, os.strerror(rc))
 
-def _decode_cli(input, *, encoding):
+def _decode_dl_step(cd, c_input, begin):
+    '''
+    convert as much as possible, starting at the given offset;
+    return (output, offset after the converted bytes, error code or 0)
+    '''
+    input_len = len(c_input) - begin
+    output_len = input_len
+    while True:
+        inbuf = ctypes.cast(ctypes.addressof(c_input) + begin, ctypes.POINTER(ctypes.c_char))
+        inbytesleft = ctypes.c_size_t(input_len)
+        assert inbytesleft.value == input_len  # no overflow
+        outbuf = ctypes.create_unicode_buffer(output_len)
+        outbytesleft = ctypes.c_size_t(output_len)  # no overflow
+        assert outbytesleft.value == output_len
+        rc = _iconv(cd, None, None, None, None)
+        if rc == ctypes.c_size_t(-1).value:
+            rc = ctypes.get_errno()
+            raise OSError(rc, os.strerror(rc))
+        inbufptr = ctypes.pointer(inbuf)
+        outbufptr = ctypes.pointer(ctypes.cast(outbuf, ctypes.POINTER(ctypes.c_char)))
+        rc = _iconv(cd,
+            inbufptr, ctypes.byref(inbytesleft),
+            outbufptr, ctypes.byref(outbytesleft),
+        )
+        if rc != ctypes.c_size_t(-1).value:
+            rc = _iconv(cd,
+                None, None,
+                outbufptr, ctypes.byref(outbytesleft),
+            )
+        if rc == ctypes.c_size_t(-1).value:
+            rc = ctypes.get_errno()
+            if rc == errno.E2BIG:
+                output_len *= 2
+                continue
+            elif rc not in {errno.EILSEQ, errno.EINVAL}:
+                raise OSError(rc, os.strerror(rc))
+        else:
+            assert inbytesleft.value == 0, '{n} bytes left'.format(n=inbytesleft.value)
+            rc = 0
+        output_len -= outbytesleft.value
+        assert output_len % ctypes.sizeof(ctypes.c_wchar) == 0
+        unicode_output_len = output_len // ctypes.sizeof(ctypes.c_wchar)
+        end = len(c_input) - inbytesleft.value
+        return (outbuf[:unicode_output_len], end, rc)
+
+def _decode_cli(input, *, encoding, errors, final):
+    if not final:
+        # iconv(1) cannot tell incomplete input from invalid input,
+        # so wait until everything is available.
+        return ('', 0)
     child = _popen('iconv', '-f', encoding, '-t', 'UTF-8')
     (stdout, stderr) = child.communicate(input)
     if stderr != b'':
         stderr = stderr.decode('ASCII', 'replace')
         stderr = _boring_iconv_stderr.sub('', stderr)
-        raise UnicodeDecodeError(encoding,
+        exc = UnicodeDecodeError(encoding,
             input,  # .object
             0,  # .begin
             len(input),  # .end
             stderr.strip()  # .reason
         )
-    return stdout.decode('UTF-8')
+        if errors == 'strict':
+            raise exc
+        # iconv(1) doesn't tell where exactly the error is,
+        # so let the error handler deal with the whole input.
+        (replacement, end) = codecs.lookup_error(errors)(exc)
+        if end < 0:
+            end += len(input)
+        output = [replacement]
+        if end < len(input):
+            (s, n) = _decode_cli(input[end:], encoding=encoding, errors=errors, final=final)
+            assert n == len(input) - end
+            output += [s]
+        return (''.join(output), len(input))
+    return (stdout.decode('UTF-8'), len(input))
 
 _decode = _decode_dl if _iconv is not None else _decode_cli
 
-__all__ = ['encode', 'decode']
+__all__ = ['encode', 'decode', 'decode_partial']
 
 # vim:ts=4 sts=4 sw=4 et
@@ -23,142 +23,182 @@ C integer expressions
 '''
 
 import ast
+import collections
 import functools
+import re
 
-import rply
-import rply.errors
+class LexingError(Exception):
+    pass
 
-LexingError = rply.errors.LexingError
-ParsingError = rply.errors.ParsingError
+class ParsingError(Exception):
+    pass
+
+class ComplexityError(ParsingError):
+    pass
 
 # http://git.savannah.gnu.org/cgit/gettext.git/tree/gettext-runtime/intl/plural.y?id=v0.18.3#n132
 
-@functools.lru_cache(maxsize=None)
-def create_lexer():
-    lg = rply.LexerGenerator()
-    lg.add('IF', r'[?]')
-    lg.add('ELSE', r':')
-    lg.add('OR', r'[|][|]')
-    lg.add('AND', r'[&][&]')
-    lg.add('EQ', r'[!=]=')
-    lg.add('CMP', r'[<>]=?')
-    lg.add('ADDSUB', r'[+-]')
-    lg.add('MULDIV', r'[*/%]')
-    lg.add('NOT', r'!')
-    lg.add('LPAR', r'[(]')
-    lg.add('RPAR', r'[)]')
-    lg.add('VAR', r'n')
-    lg.add('INT', r'[0-9]+')
-    lg.ignore(r'[ \t]+')
-    return lg.build()
-
-@functools.lru_cache(maxsize=None)
-def create_parser(lexer):
-    pg = rply.ParserGenerator(
-        [rule.name for rule in lexer.rules],
-        precedence=[
-            ('right', ['IF', 'ELSE']),
-            ('left', ['OR']),
-            ('left', ['AND']),
-            ('left', ['EQ']),
-            ('left', ['CMP']),
-            ('left', ['ADDSUB']),
-            ('left', ['MULDIV']),
-            ('right', ['NOT']),
-        ],
-        cache_id='i18nspector-intexpr',
-    )
-    ast_bool = {
-        '&&': ast.And(),
-        '||': ast.Or(),
-    }
-    ast_cmp = {
-        '==': ast.Eq(),
-        '!=': ast.NotEq(),
-        '<': ast.Lt(),
-        '<=': ast.LtE(),
-        '>': ast.Gt(),
-        '>=': ast.GtE(),
-    }
-    ast_arithmetic = {
-        '+': ast.Add(),
-        '-': ast.Sub(),
-        '*': ast.Mult(),
-        '/': ast.Div(),
-        '%': ast.Mod(),
-    }
-    ast_not = ast.Not()
-    # pylint: disable=unused-variable
-    @pg.production('start : exp')
-    def eval_start(p):
-        [exp] = p
-        return ast.Expr(exp)
-    @pg.production('exp : exp IF exp ELSE exp')
-    def expr_ifelse(p):
-        [cond, _, body, _, orelse] = p
-        return ast.IfExp(cond, body, orelse)
-    @pg.production('exp : exp OR exp')
-    @pg.production('exp : exp AND exp')
-    def expr_bool(p):
-        [left, tok, right] = p
-        op = ast_bool[tok.getstr()]
-        return ast.BoolOp(op, [left, right])
-    @pg.production('exp : exp EQ exp')
-    @pg.production('exp : exp CMP exp')
-    def expr_cmp(p):
-        [left, tok, right] = p
-        op = ast_cmp[tok.getstr()]
-        return ast.Compare(left, [op], [right])
-    @pg.production('exp : exp ADDSUB exp')
-    @pg.production('exp : exp MULDIV exp')
-    def expr_arithmetic(p):
-        [left, tok, right] = p
-        op = ast_arithmetic[tok.getstr()]
-        return ast.BinOp(left, op, right)
-    @pg.production('exp : NOT exp')
-    def expr_not(p):
-        [_, value] = p
-        return ast.UnaryOp(ast_not, value)
-    @pg.production('exp : LPAR exp RPAR')
-    def expr_par(p):
-        [_, exp, _] = p
-        return exp
-    @pg.production('exp : VAR')
-    def expr_var(p):
-        [tok] = p
-        ident = tok.getstr()
-        assert ident == 'n'
-        return ast.Name(ident, ast.Load())
-    @pg.production('exp : INT')
-    def expr_int(p):
-        [tok] = p
-        n = int(tok.getstr())
-        return ast.Num(n)
-    # pylint: enable=unused-variable
-    with misc.throwaway_tempdir('rply'):
-        # Use private temporary directory
-        # to mitigate RPLY's insecure use of /tmp:
-        # CVE-2014-1604, CVE-2014-1938
-        return pg.build()
+# Alternatives are tried in order; the first one that matches wins.
+_match_token = re.compile(r'''
+  (?P<SPACE> [ \t]+ )
+| (?P<IF> [?] )
+| (?P<ELSE> : )
+| (?P<OR> [|][|] )
+| (?P<AND> [&][&] )
+| (?P<EQ> [!=]= )
+| (?P<CMP> [<>]=? )
+| (?P<ADDSUB> [+-] )
+| (?P<MULDIV> [*/%] )
+| (?P<NOT> ! )
+| (?P<LPAR> [(] )
+| (?P<RPAR> [)] )
+| (?P<VAR> n )
+| (?P<INT> [0-9]+ )
+''', re.VERBOSE).match
+
+def lex(s):
+    '''
+    generate (token type, token string) pairs
+    '''
+    pos = 0
+    while pos < len(s):
+        match = _match_token(s, pos)
+        if match is None:
+            raise LexingError('unexpected character at position {}'.format(pos))
+        pos = match.end()
+        if match.lastgroup != 'SPACE':
+            yield (match.lastgroup, match.group())
+
+# binary operators, from the lowest to the highest precedence;
+# all of them are left-associative:
+_binary_precedence = dict(
+    OR=1,
+    AND=2,
+    EQ=3,
+    CMP=4,
+    ADDSUB=5,
+    MULDIV=6,
+)
+# The conditional operator has the lowest precedence,
+# and it's right-associative.
+_ifelse_precedence = 0
+# The negation operator binds tighter than any binary operator.
+
+_ast_bool = {
+    '&&': ast.And(),
+    '||': ast.Or(),
+}
+_ast_cmp = {
+    '==': ast.Eq(),
+    '!=': ast.NotEq(),
+    '<': ast.Lt(),
+    '<=': ast.LtE(),
+    '>': ast.Gt(),
+    '>=': ast.GtE(),
+}
+_ast_arithmetic = {
+    '+': ast.Add(),
+    '-': ast.Sub(),
+    '*': ast.Mult(),
+    '/': ast.Div(),
+    '%': ast.Mod(),
+}
+_ast_not = ast.Not()
+
+class _ParserState(object):
+
+    def __init__(self, s):
+        self._tokens = lex(s)
+        self._advance()
+
+    def _advance(self):
+        token = next(self._tokens, (None, None))
+        (self._type, self._value) = token
+
+    def _expect(self, tp):
+        if self._type != tp:
+            raise ParsingError('expected {}'.format(tp))
+        self._advance()
+
+    def parse(self):
+        node = self._parse_exp(_ifelse_precedence)
+        if self._type is not None:
+            raise ParsingError('unexpected ' + self._type)
+        return ast.Expr(node)
+
+    def _parse_exp(self, min_precedence):
+        left = self._parse_unary()
+        while True:
+            tp = self._type
+            precedence = _binary_precedence.get(tp)
+            if precedence is not None and precedence >= min_precedence:
+                tok = self._value
+                self._advance()
+                right = self._parse_exp(precedence + 1)
+                if tp in {'OR', 'AND'}:
+                    left = ast.BoolOp(_ast_bool[tok], [left, right])
+                elif tp in {'EQ', 'CMP'}:
+                    left = ast.Compare(left, [_ast_cmp[tok]], [right])
+                else:
+                    left = ast.BinOp(left, _ast_arithmetic[tok], right)
+            elif tp == 'IF' and _ifelse_precedence >= min_precedence:
+                self._advance()
+                body = self._parse_exp(_ifelse_precedence)
+                self._expect('ELSE')
+                orelse = self._parse_exp(_ifelse_precedence)
+                left = ast.IfExp(left, body, orelse)
+            else:
+                return left
+
+    def _parse_unary(self):
+        tp = self._type
+        if tp == 'NOT':
+            self._advance()
+            value = self._parse_unary()
+            return ast.UnaryOp(_ast_not, value)
+        elif tp == 'LPAR':
+            self._advance()
+            node = self._parse_exp(_ifelse_precedence)
+            self._expect('RPAR')
+            return node
+        elif tp == 'VAR':
+            ident = self._value
+            assert ident == 'n'
+            self._advance()
+            return ast.Name(ident, ast.Load())
+        elif tp == 'INT':
+            n = int(self._value)
+            self._advance()
+            return ast.Num(n)
+        elif tp is None:
+            raise ParsingError('unexpected end of input')
+        else:
+            raise ParsingError('unexpected ' + tp)
 
 class Parser(object):
 
-    def __init__(self):
-        self._lexer = create_lexer()
-        self._parser = create_parser(self._lexer)
-
     def parse(self, s):
-        tokens = self._lexer.lex(s)
-        node = self._parser.parse(tokens)
+        try:
+            node = _ParserState(s).parse()
+        except RuntimeError:
+            # RecursionError is a subclass of RuntimeError,
+            # but it's available only in Python >= 3.5.
+            raise ComplexityError('expression nested too deeply')
         return Expression(node)
 
 from lib import misc  # pylint: disable=wrong-import-position
 
 class BaseEvaluator(object):
 
+    '''
+    visit the expression tree;
+    results for identical (interned) subexpressions are computed only once
+    '''
+
     def __init__(self, node):
         self._ctxt = misc.Namespace()
         self._node = node
+        self._cache = {}
 
     def __call__(self):
         node = self._node
@@ -166,11 +206,19 @@ class BaseEvaluator(object):
         return self._visit_expr(node)
 
     def _visit(self, node, *args):
+        if not args:
+            try:
+                return self._cache[node]
+            except KeyError:
+                pass
         try:
             fn = getattr(self, '_visit_' + type(node).__name__.lower())
         except KeyError:  # no coverage
             raise NotImplementedError(type(node).__name__)
-        return fn(node, *args)
+        result = fn(node, *args)
+        if not args:
+            self._cache[node] = result
+        return result
 
     def _visit_expr(self, node):
         [node] = ast.iter_child_nodes(node)
@@ -313,11 +361,332 @@ class Evaluator(BaseEvaluator):
     def _visit_num(self, node):
         return self._check_overflow(node.n)
 
+    _visit_constant = _visit_num  # Python >= 3.8
+
     def _visit_name(self, node):
         return self._check_overflow(self._ctxt.n)
 
     # pylint: enable=unused-argument
 
+def _children(node):
+    '''
+    return subexpressions of the node
+    '''
+    if isinstance(node, ast.BinOp):
+        return (node.left, node.right)
+    elif isinstance(node, ast.UnaryOp):
+        return (node.operand,)
+    elif isinstance(node, ast.Compare):
+        return (node.left,) + tuple(node.comparators)
+    elif isinstance(node, ast.BoolOp):
+        return tuple(node.values)
+    elif isinstance(node, ast.IfExp):
+        return (node.test, node.body, node.orelse)
+    else:
+        return ()
+
+class Interner(BaseEvaluator):
+
+    '''
+    rebuild the expression as a DAG,
+    in which identical subexpressions are the same object,
+    and constant subexpressions are folded
+    '''
+
+    def __init__(self, node, *, bits):
+        super().__init__(node)
+        self._ctxt.bits = bits
+        self._ctxt.nodes = {}
+
+    def __call__(self):
+        return ast.Expr(super().__call__())
+
+    def _is_constant(self, node):
+        return isinstance(node, ast.Num) and 0 <= node.n < (1 << self._ctxt.bits)
+
+    def _intern(self, key, node):
+        try:
+            return self._ctxt.nodes[key]
+        except KeyError:
+            pass
+        children = _children(node)
+        if children and all(isinstance(child, ast.Num) for child in children):
+            node = self._fold(node)
+            if isinstance(node, ast.Num):
+                key = node.n
+        return self._ctxt.nodes.setdefault(key, node)
+
+    def _fold(self, node):
+        e = Evaluator(ast.Expr(node), 0, bits=self._ctxt.bits)
+        try:
+            n = e()
+        except (OverflowError, ZeroDivisionError):
+            # keep it, so that the error is raised when (and if) evaluated
+            return node
+        return ast.Num(n)
+
+    # binary operators
+    # ================
+
+    def _visit_binop(self, node):
+        x = self._visit(node.left)
+        y = self._visit(node.right)
+        key = (type(node.op), x, y)
+        return self._intern(key, ast.BinOp(x, node.op, y))
+
+    # unary operators
+    # ===============
+
+    def _visit_unaryop(self, node):
+        x = self._visit(node.operand)
+        key = (type(node.op), x)
+        return self._intern(key, ast.UnaryOp(node.op, x))
+
+    # comparison operators
+    # ====================
+
+    def _visit_compare(self, node):
+        if len(node.ops) != 1:
+            raise NotImplementedError
+        [op] = node.ops
+        [right] = node.comparators
+        x = self._visit(node.left)
+        y = self._visit(right)
+        key = (type(op), x, y)
+        return self._intern(key, ast.Compare(x, [op], [y]))
+
+    # boolean operators
+    # =================
+
+    def _visit_boolop(self, node):
+        values = [self._visit(arg) for arg in node.values]
+        [first, *rest] = values
+        if rest and self._is_constant(first):
+            # (0 && …) = 0, (1 || …) = 1
+            decided = isinstance(node.op, ast.Or)
+            if bool(first.n) == decided:
+                return self._intern(int(decided), ast.Num(int(decided)))
+        key = (type(node.op),) + tuple(values)
+        return self._intern(key, ast.BoolOp(node.op, values))
+
+    # if-then-else expression
+    # =======================
+
+    def _visit_ifexp(self, node):
+        test = self._visit(node.test)
+        body = self._visit(node.body)
+        orelse = self._visit(node.orelse)
+        if self._is_constant(test):
+            return body if test.n else orelse
+        key = (ast.IfExp, test, body, orelse)
+        return self._intern(key, ast.IfExp(test, body, orelse))
+
+    # constants, variables
+    # ====================
+
+    def _visit_num(self, node):
+        n = node.n
+        return self._intern(n, ast.Num(n))
+
+    _visit_constant = _visit_num  # Python >= 3.8
+
+    def _visit_name(self, node):
+        return self._intern(ast.Name, ast.Name(node.id, ast.Load()))
+
+class Compiler(BaseEvaluator):
+
+    '''
+    translate the expression into Python source code,
+    with the same semantics as Evaluator,
+    provided that n is within range
+    '''
+
+    def __init__(self, node, *, bits):
+        super().__init__(node)
+        self._ctxt.max = 1 << bits
+        self._ctxt.names = {}
+
+    def __call__(self):
+        '''
+        return list of statements of the function body
+        '''
+        statements = []
+        # Subexpressions that occur more than once are computed up front,
+        # but only if they can't raise exceptions:
+        for node in self._get_shared_nodes():
+            source = super()._visit(node)
+            name = '_t{i}'.format(i=len(statements))
+            statements += ['{name} = {source}'.format(name=name, source=source)]
+            self._ctxt.names[node] = name
+        statements += ['return ' + super().__call__()]
+        return statements
+
+    def _visit(self, node, *args):
+        if not args:
+            name = self._ctxt.names.get(node)
+            if name is not None:
+                return name
+        return super()._visit(node, *args)
+
+    def _get_shared_nodes(self):
+        '''
+        return safe subexpressions with more than one parent,
+        children before parents
+        '''
+        [root] = ast.iter_child_nodes(self._node)
+        refs = collections.Counter()
+        order = []
+        seen = set()
+        stack = [(root, False)]
+        while stack:
+            (node, done) = stack.pop()
+            if done:
+                order += [node]
+                continue
+            if node in seen:
+                continue
+            seen.add(node)
+            stack += [(node, True)]
+            for child in reversed(_children(node)):
+                refs[child] += 1
+                stack += [(child, False)]
+        safe = {}
+        for node in order:
+            safe[node] = self._is_safe(node, safe)
+        return [
+            node for node in order
+            if refs[node] > 1 and safe[node] and _children(node)
+        ]
+
+    def _is_safe(self, node, safe):
+        '''
+        check if evaluating the node can't raise an exception,
+        assuming that the children have been already checked
+        '''
+        if isinstance(node, ast.Num):
+            return 0 <= node.n < self._ctxt.max
+        if not all(safe[child] for child in _children(node)):
+            return False
+        if isinstance(node, ast.BinOp):
+            if isinstance(node.op, (ast.Div, ast.Mod)):
+                right = node.right
+                return isinstance(right, ast.Num) and right.n > 0
+            return False  # possible overflow
+        return True
+
+    # pylint: disable=unused-argument
+
+    # binary operators
+    # ================
+
+    def _visit_add(self, node, x, y):
+        return '_check({x} + {y})'.format(x=x, y=y)
+
+    def _visit_sub(self, node, x, y):
+        return '_check({x} - {y})'.format(x=x, y=y)
+
+    def _visit_mult(self, node, x, y):
+        return '_check({x} * {y})'.format(x=x, y=y)
+
+    def _visit_div(self, node, x, y):
+        return '({x} // {y})'.format(x=x, y=y)
+
+    def _visit_mod(self, node, x, y):
+        return '({x} % {y})'.format(x=x, y=y)
+
+    # unary operators
+    # ===============
+
+    def _visit_not(self, node, x):
+        return '(0 if {x} else 1)'.format(x=x)
+
+    # comparison operators
+    # ====================
+
+    def _compare(self, x, op, y):
+        return '(1 if {x} {op} {y} else 0)'.format(x=x, op=op, y=y)
+
+    def _visit_gte(self, node, x, y):
+        return self._compare(x, '>=', y)
+
+    def _visit_gt(self, node, x, y):
+        return self._compare(x, '>', y)
+
+    def _visit_lte(self, node, x, y):
+        return self._compare(x, '<=', y)
+
+    def _visit_lt(self, node, x, y):
+        return self._compare(x, '<', y)
+
+    def _visit_eq(self, node, x, y):
+        return self._compare(x, '==', y)
+
+    def _visit_noteq(self, node, x, y):
+        return self._compare(x, '!=', y)
+
+    # boolean operators
+    # =================
+
+    def _visit_and(self, node, *args):
+        args = ' and '.join(self._visit(arg) for arg in args)
+        return '(1 if {args} else 0)'.format(args=args)
+
+    def _visit_or(self, node, *args):
+        args = ' or '.join(self._visit(arg) for arg in args)
+        return '(1 if {args} else 0)'.format(args=args)
+
+    # if-then-else expression
+    # =======================
+
+    def _visit_ifexp(self, node):
+        return '({body} if {test} else {orelse})'.format(
+            test=self._visit(node.test),
+            body=self._visit(node.body),
+            orelse=self._visit(node.orelse),
+        )
+
+    # constants, variables
+    # ====================
+
+    def _visit_num(self, node):
+        n = node.n
+        if (n < 0) or (n >= self._ctxt.max):
+            # overflow, but only if evaluated
+            return '_check({n})'.format(n=n)
+        return str(n)
+
+    _visit_constant = _visit_num  # Python >= 3.8
+
+    def _visit_name(self, node):
+        return 'n'
+
+    # pylint: enable=unused-argument
+
+def _compile(node, *, bits):
+    '''
+    return a Python function equivalent to Evaluator for n within range,
+    or None if the expression is too complex to be compiled
+    '''
+    max_ = 1 << bits
+    def check(n):
+        if n < 0:
+            raise OverflowError(n)
+        if n >= max_:
+            raise OverflowError(n)
+        return n
+    try:
+        statements = Compiler(node, bits=bits)()
+        source = 'def f(n):\n' + ''.join(
+            '    {}\n'.format(stmt) for stmt in statements
+        )
+        code = compile(source, '<intexpr>', 'exec')
+    except (SyntaxError, RuntimeError, MemoryError):
+        # too deeply nested for the Python compiler
+        return
+    namespace = dict(_check=check)
+    exec(code, namespace)  # pylint: disable=exec-used
+    return namespace['f']
+
 class CodomainEvaluator(BaseEvaluator):
 
     def __init__(self, node, *, bits):
@@ -509,6 +878,8 @@ class CodomainEvaluator(BaseEvaluator):
             return
         return (n, n)
 
+    _visit_constant = _visit_num  # Python >= 3.8
+
     def _visit_name(self, node):
         return (0, self._ctxt.max - 1)
 
@@ -666,30 +1037,195 @@ class PeriodEvaluator(BaseEvaluator):
             return
         return (0, 1)
 
+    _visit_constant = _visit_num  # Python >= 3.8
+
     def _visit_name(self, node):  # pylint: disable=unused-argument
         return
 
+RangeEvaluation = collections.namedtuple('RangeEvaluation', [
+    'values',  # [f(start), f(start + 1), …], up to the first error
+    'error',  # (n, exception) for the first n that couldn't be evaluated, or None
+    'preimage',  # {f(n): [n, …]}
+    'histogram',  # {f(n): len(preimage[f(n)])}
+])
+
+Complexity = collections.namedtuple('Complexity', [
+    'nodes',  # number of nodes in the expression tree
+    'depth',  # depth of the expression tree
+])
+
+Preimage = collections.namedtuple('Preimage', [
+    'ranges',  # {f(n): [range, …]}
+    'complete',  # whether the ranges cover every n in the domain
+])
+
 class Expression(object):
 
     def __init__(self, node):
         if not isinstance(node, ast.Expr):
             raise TypeError  # no coverage
         self._node = node
+        self._dags = {}
+        self._functions = {}
+
+    def complexity(self):
+        '''
+        return Complexity of the expression tree;
+        this doesn't recurse, so it's safe for any expression
+        '''
+        [root] = ast.iter_child_nodes(self._node)
+        nodes = depth = 0
+        stack = [(root, 1)]
+        while stack:
+            (node, node_depth) = stack.pop()
+            nodes += 1
+            depth = max(depth, node_depth)
+            stack += [(child, node_depth + 1) for child in _children(node)]
+        return Complexity(nodes=nodes, depth=depth)
+
+    def _get_dag(self, bits):
+        try:
+            return self._dags[bits]
+        except KeyError:
+            pass
+        dag = self._dags[bits] = Interner(self._node, bits=bits)()
+        return dag
+
+    def _get_function(self, bits):
+        try:
+            return self._functions[bits]
+        except KeyError:
+            pass
+        fn = self._functions[bits] = _compile(self._get_dag(bits), bits=bits)
+        return fn
 
     def __call__(self, n, *, bits=32):
         '''
         return f(n)
         '''
-        e = Evaluator(self._node, n, bits=bits)
+        fn = self._get_function(bits)
+        if fn is not None and 0 <= n < (1 << bits):
+            return fn(n)
+        # n is out of range, so let the evaluator raise OverflowError
+        # in the right place
+        e = Evaluator(self._get_dag(bits), n, bits=bits)
         return e()
 
+    def evaluate_range(self, start, stop, *, bits=32):
+        '''
+        evaluate f(n) for every n in range(start, stop);
+        return RangeEvaluation
+        '''
+        values = []
+        append = values.append
+        error = None
+        fn = self._get_function(bits)
+        if fn is None or start < 0 or stop > (1 << bits):
+            fn = functools.partial(self, bits=bits)
+        n = start
+        try:
+            for n in range(start, stop):
+                append(fn(n))
+        except (OverflowError, ZeroDivisionError) as exc:
+            error = (n, exc)
+        preimage = {}
+        for n, value in enumerate(values, start):
+            try:
+                preimage[value] += [n]
+            except KeyError:
+                preimage[value] = [n]
+        histogram = {value: len(ns) for value, ns in preimage.items()}
+        return RangeEvaluation(
+            values=values,
+            error=error,
+            preimage=preimage,
+            histogram=histogram,
+        )
+
+    def preimage(self, *, bits=32, limit=200):
+        '''
+        return Preimage of every n in [0, 2 ** bits);
+        only one period (plus the pre-periodic prefix) is evaluated;
+        if the period is unknown or too long,
+        or the expression cannot be evaluated for some n,
+        the result is built from n in range(0, limit) and is not complete
+        '''
+        domain = 1 << bits
+        period = self.period(bits=bits)
+        if period is None:
+            (offset, period) = (domain, 1)
+        else:
+            (offset, period) = period
+            if offset + period >= domain:
+                (offset, period) = (domain, 1)
+        stop = min(offset + period, domain)
+        complete = stop <= limit
+        if not complete:
+            (offset, stop) = (limit, limit)
+        evaluation = self.evaluate_range(0, stop, bits=bits)
+        if evaluation.error is not None:
+            (complete, offset) = (False, stop)
+        ranges = {}
+        for n, value in enumerate(evaluation.values):
+            rngs = ranges.setdefault(value, [])
+            if n < offset:
+                rng = range(n, n + 1)
+            else:
+                rng = range(n, domain, period)
+            if rngs and rngs[-1].step == rng.step == 1 and rngs[-1].stop == n:
+                rng = range(rngs[-1].start, rng.stop)
+                rngs[-1] = rng
+            else:
+                rngs += [rng]
+        return Preimage(ranges=ranges, complete=complete)
+
+    def fingerprint(self, *, bits=32, limit=200):
+        '''
+        return
+        * (O, (f(0), f(1), …, f(O + P - 1))),
+          where O and P are the smallest numbers such that
+          for every n ≥ O: f(n + P) = f(n);
+          equivalent expressions have equal fingerprints
+        * or None, if the period is unknown or too long,
+          or the expression cannot be evaluated for some n
+        '''
+        period = self.period(bits=bits)
+        if period is None:
+            return
+        (offset, period) = period
+        if offset + period > min(limit, 1 << bits):
+            return
+        evaluation = self.evaluate_range(0, offset + period, bits=bits)
+        if evaluation.error is not None:
+            return
+        values = evaluation.values
+        cycle = values[offset:]
+        def f(n):
+            if n < offset:
+                return values[n]
+            return cycle[(n - offset) % period]
+        # the smallest period:
+        min_period = next(
+            d for d in range(1, period + 1)
+            if period % d == 0
+            if all(f(i) == f(i + d) for i in range(offset, offset + period))
+        )
+        # the smallest offset:
+        min_offset = offset
+        while min_offset > 0 and f(min_offset - 1) == f(min_offset - 1 + min_period):
+            min_offset -= 1
+        return (
+            min_offset,
+            tuple(f(i) for i in range(min_offset + min_period)),
+        )
+
     def codomain(self, *, bits=32):
         '''
         return
         * (L, R) such that for every n: L ≤ f(n) ≤ R
         * or None
         '''
-        e = CodomainEvaluator(self._node, bits=bits)
+        e = CodomainEvaluator(self._get_dag(bits), bits=bits)
         return e()
 
     def period(self, *, bits=32):
@@ -698,7 +1234,7 @@ class Expression(object):
         * (O, P) such that for every n ≥ O: f(n + P) = f(n)
         * or None
         '''
-        e = PeriodEvaluator(self._node, bits=bits)
+        e = PeriodEvaluator(self._get_dag(bits), bits=bits)
         return e()
 
 # vim:ts=4 sts=4 sw=4 et
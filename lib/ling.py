@@ -23,10 +23,13 @@ language information registry
 '''
 
 import configparser
+import functools
 import os
 import re
 import unicodedata
 
+from lib import encodings as encinfo
+from lib import gettext
 from lib import misc
 from lib import paths
 
@@ -151,6 +154,16 @@ class Language(object):
             result = _get_plural_forms(code)
         return result
 
+    def get_plural_rules(self):
+        result = None
+        if self.territory_code is not None:
+            code = self._simple_format()
+            result = _get_plural_rules(code)
+        if result is None:
+            code = self._simple_format(territory=False)
+            result = _get_plural_rules(code)
+        return result
+
     def get_unrepresentable_characters(self, encoding, strict=False):
         characters = None
         if self.territory_code is not None:
@@ -161,6 +174,17 @@ class Language(object):
             characters = _get_characters(code, self.modifier, strict=strict)
         if characters is None:
             return
+        coverage = encinfo.get_character_coverage(encoding)
+        if coverage is not None:
+            try:
+                return [
+                    character for character in characters
+                    if not coverage.is_representable(character)
+                ]
+            except KeyError:
+                # The coverage data doesn't know about these characters.
+                # Fall back to asking the codec.
+                pass
         result = []
         try:
             # If iconv(1) is used to implement an encoding, there's a huge
@@ -326,6 +350,78 @@ def _get_plural_forms(language):
         if s and not s.isspace()
     ]
 
+# values of f(0), f(1), …, f(limit - 1) are precomputed for every rule:
+plural_rule_values_limit = 200
+
+class PluralRule(object):
+    '''
+    parsed Plural-Forms rule from the language data
+    '''
+
+    def __init__(self, plural_forms):
+        self.plural_forms = plural_forms
+        (self.n, self.expression) = gettext.parse_plural_forms(plural_forms)
+        evaluation = self.expression.evaluate_range(0, plural_rule_values_limit)
+        self.values = evaluation.values
+        self.fingerprint = self.expression.fingerprint(limit=plural_rule_values_limit)
+
+class PluralRules(object):
+    '''
+    Plural-Forms rules for a language, indexed by the number of plural forms
+    '''
+
+    def __init__(self, language, plural_forms):
+        self.language = language
+        rules = {}
+        for s in plural_forms:
+            rule = _get_plural_rule(s)
+            rules[rule.n] = rules.get(rule.n, ()) + (rule,)
+        self._rules = rules
+
+    def __getitem__(self, n):
+        return self._rules.get(n, ())
+
+@functools.lru_cache(maxsize=None)
+def _get_plural_rule(plural_forms):
+    return PluralRule(plural_forms)
+
+@functools.lru_cache(maxsize=None)
+def _get_plural_rules(language):
+    plural_forms = _get_plural_forms(language)
+    if plural_forms is None:
+        return
+    return PluralRules(language, plural_forms)
+
+@functools.lru_cache(maxsize=None)
+def _get_plural_rule_index():
+    index = {}
+    for language in _primary_languages:
+        for s in _get_plural_forms(language) or ():
+            rule = _get_plural_rule(s)
+            if rule.fingerprint is None:
+                continue  # no coverage
+            key = (rule.n, rule.fingerprint)
+            index.setdefault(key, []).append(language)
+    return index
+
+def get_language_codes_for_plural_rule(n, fingerprint):
+    '''
+    return codes of languages whose Plural-Forms rule has the given
+    number of plural forms and the given expression fingerprint
+    '''
+    return _get_plural_rule_index().get((n, fingerprint), ())
+
+def get_languages_for_plural_forms(n, expression):
+    '''
+    return languages whose Plural-Forms rule is equivalent to
+    nplurals=<n>; plural=<expression>
+    '''
+    fingerprint = expression.fingerprint(limit=plural_rule_values_limit)
+    if fingerprint is None:
+        return []
+    languages = get_language_codes_for_plural_rule(n, fingerprint)
+    return [parse_language(language) for language in languages]
+
 def _get_principal_territory_code(language):
     try:
         section = _primary_languages[language]
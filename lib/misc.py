@@ -24,6 +24,7 @@ miscellanea
 
 import contextlib
 import datetime
+import re
 import sys
 import tempfile
 import types
@@ -94,6 +95,15 @@ Namespace()  # make pyflakes and coverage.py happy
 if sys.version_info >= (3, 3):  # no coverage
     Namespace = types.SimpleNamespace
 
+def is_ascii(s, *, _search=re.compile('[^\x00-\x7F]').search):
+    '''
+    check if the string consists only of ASCII characters
+    '''
+    return _search(s) is None
+
+if sys.version_info >= (3, 7):  # no coverage
+    is_ascii = str.isascii
+
 @contextlib.contextmanager
 def throwaway_tempdir(context):
     with tempfile.TemporaryDirectory(prefix='i18nspector.{}.'.format(context)) as new_tempdir:
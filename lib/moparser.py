@@ -150,7 +150,7 @@ class Parser(object):
             if encoding is None:
                 encoding = 'ASCII'
             else:
-                if not encodings.is_ascii_compatible_encoding(encoding):
+                if not encodings.get_encoding_info(encoding).ascii_compatible:
                     encoding = 'ASCII'
             self._encoding = encoding
         else:
@@ -160,20 +160,21 @@ class Parser(object):
                 raise SyntaxError('messages are not sorted')
         self._last_msgid = msgid  # pylint: disable=attribute-defined-outside-init
         assert encoding is not None
+        errors = encodings.get_decoding_error_handler()
         msgid, *msgctxt = msgid.split(b'\x04', 1)
-        kwargs = dict(msgid=msgid.decode(encoding))
+        kwargs = dict(msgid=msgid.decode(encoding, errors))
         if msgctxt:
             [msgctxt] = msgctxt
-            kwargs.update(msgctxt=msgctxt.decode(encoding))
+            kwargs.update(msgctxt=msgctxt.decode(encoding, errors))
         if len(msgids) == 1:
             assert [msgstr] == msgstrs
-            kwargs.update(msgstr=msgstr.decode(encoding))
+            kwargs.update(msgstr=msgstr.decode(encoding, errors))
         else:
             assert len(msgids) == 2
             assert len(msgstrs) >= 1
-            kwargs.update(msgid_plural=msgids[1].decode(encoding))
+            kwargs.update(msgid_plural=msgids[1].decode(encoding, errors))
             kwargs.update(msgstr_plural=
-                {i: s.decode(encoding) for i, s in enumerate(msgstrs)}
+                {i: s.decode(encoding, errors) for i, s in enumerate(msgstrs)}
             )
         entry = polib.MOEntry(**kwargs)
         entry.comment = None
@@ -65,7 +65,7 @@ def default_encoding_patch():
 
 class Codecs(object):
 
-    _iterlines = re.compile(r'[^\n]*(?:\n|\Z)').findall
+    _chunk_size = 1 << 16
     _atypical_comment = re.compile(r'#[^ .:,|~]').match
 
     def __getattr__(self, attr):
@@ -74,24 +74,83 @@ class Codecs(object):
     def open(self, path, mode, encoding):
         if mode not in {'rU', 'rt'}:
             raise NotImplementedError
-        if not encodings.is_ascii_compatible_encoding(encoding):
+        if not encodings.get_encoding_info(encoding).ascii_compatible:
             encoding = 'ASCII'
-        with open(path, 'rb') as file:
-            contents = file.read()
-        contents = contents.decode(encoding)
+        errors = encodings.get_decoding_error_handler()
+        decoder = codecs.getincrementaldecoder(encoding)(errors)
+        file = open(path, 'rb')
+        return self._read(file, encoding, decoder)
+
+    def _iterlines(self, file, encoding, decoder):
+        with file:
+            # pieces of the last, unfinished line;
+            # they are joined only once the line is complete,
+            # so that very long lines don't take quadratic time
+            tail = []
+            offset = 0
+            error_log = []
+            final = False
+            while not final:
+                chunk = file.read(self._chunk_size)
+                final = not chunk
+                with encodings.collect_decoding_errors() as chunk_errors:
+                    try:
+                        s = decoder.decode(chunk, final=final)
+                    except UnicodeDecodeError:
+                        # Decode the whole file again,
+                        # so that the exception refers to the whole file.
+                        file.seek(0)
+                        file.read().decode(encoding)
+                        raise
+                for exc in chunk_errors:
+                    # The exception object may include bytes carried over
+                    # from the previous chunk.
+                    base = offset + len(chunk) - len(exc.object)
+                    error_log += [(exc.encoding, base + exc.start, base + exc.end, exc.reason)]
+                offset += len(chunk)
+                lines = s.split('\n')
+                if len(lines) > 1:
+                    tail += [lines[0]]
+                    lines[0] = ''.join(tail)
+                    tail = []
+                s = lines.pop()
+                if s:
+                    tail += [s]
+                for line in lines:
+                    yield line + '\n'
+            if tail:
+                yield ''.join(tail)
+            if error_log:
+                # Make the exceptions refer to the whole file.
+                file.seek(0)
+                data = file.read()
+                for (exc_encoding, start, end, reason) in error_log:
+                    exc = UnicodeDecodeError(exc_encoding, data, start, end, reason)
+                    encodings.record_decoding_error(exc)
+
+    def _read(self, file, encoding, decoder):
         pending_comments = []
         empty = True
-        for line in self._iterlines(contents):
-            if self._atypical_comment(line):
-                line = '# ' + line[1:]
-            if line[:2] in {'', '# '} or line.isspace():
-                pending_comments += [line]
-            else:
-                for comment_line in pending_comments:
-                    yield comment_line
-                pending_comments = []
-                yield line
-                empty = False
+        lines = self._iterlines(file, encoding, decoder)
+        try:
+            for line in lines:
+                if self._atypical_comment(line):
+                    line = '# ' + line[1:]
+                if line[:2] in {'', '# '} or line.isspace():
+                    pending_comments += [line]
+                else:
+                    for comment_line in pending_comments:
+                        yield comment_line
+                    pending_comments = []
+                    yield line
+                    empty = False
+        except GeneratorExit:
+            # polib gave up, most likely because of a syntax error.
+            # Decoding errors should take precedence,
+            # so check the rest of the file before letting go.
+            for line in lines:
+                pass
+            raise
         if empty:
             yield '# '
 
@@ -0,0 +1,81 @@
+# Copyright © 2017 Jakub Wilk <jwilk@jwilk.net>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+'''
+string format checks
+'''
+
+import functools
+
+def uncached_parser(format_string_type, directive_chars):
+    '''
+    return a function that parses a format string,
+    like format_string_type(s) does;
+    strings that don't contain any of the directive_chars are not parsed:
+    the same shared no-directives result is returned for all of them
+    '''
+    no_directives = format_string_type('')
+    if len(directive_chars) == 1:
+        [ch] = directive_chars
+        def has_directives(s):
+            return ch in s
+    else:
+        def has_directives(s):
+            return any(ch in s for ch in directive_chars)
+    def parse(s):
+        if not has_directives(s):
+            return no_directives
+        return format_string_type(s)
+    parse.has_directives = has_directives
+    parse.no_directives = no_directives
+    return parse
+
+def cached_parser(parse_uncached, error_type, *, maxsize=4096):
+    '''
+    return a function that parses a format string,
+    like parse_uncached(s) does;
+    parsed strings (and errors) are memoized,
+    because the same msgids are parsed over and over again,
+    in every PO file that translates them
+    '''
+    has_directives = parse_uncached.has_directives
+    no_directives = parse_uncached.no_directives
+    @functools.lru_cache(maxsize=maxsize)
+    def parse_cached(s):
+        try:
+            return (parse_uncached(s), None)
+        except error_type as exc:
+            return (None, (type(exc), exc.args))
+    def parse(s):
+        if not has_directives(s):
+            return no_directives
+        (fmt, exc) = parse_cached(s)
+        if exc is not None:
+            # Raise a fresh exception object every time,
+            # so that tracebacks and contexts aren't shared between callers:
+            (exc_type, exc_args) = exc
+            raise exc_type(*exc_args)
+        return fmt
+    parse.cache_info = parse_cached.cache_info
+    parse.cache_clear = parse_cached.cache_clear
+    parse.no_directives = no_directives
+    return parse
+
+# vim:ts=4 sts=4 sw=4 et
@@ -25,6 +25,8 @@ string format checks: C
 import collections
 import re
 
+from lib import strformat
+
 _directive_re = re.compile('''
     (?P<literal> [^%]+ ) |
     (
@@ -154,6 +156,7 @@ class PrecisionRangeError(Error):
 
 class VariableWidth(object):
 
+    __slots__ = ('parent',)
     type = 'int'
 
     def __init__(self, parent):
@@ -161,6 +164,7 @@ class VariableWidth(object):
 
 class VariablePrecision(object):
 
+    __slots__ = ('parent',)
     type = 'int'
 
     def __init__(self, parent):
@@ -168,6 +172,14 @@ class VariablePrecision(object):
 
 class FormatString(object):
 
+    __slots__ = (
+        '_items',
+        '_argument_map',
+        '_next_arg_index',
+        'warnings',
+        'arguments',
+    )
+
     def __init__(self, s):
         self._items = items = []
         self._argument_map = collections.defaultdict(list)
@@ -189,7 +201,7 @@ class FormatString(object):
             raise Error(
                 _printable_prefix(s[last_pos:])
             )
-        self.arguments = []
+        arguments = []
         for i in range(1, NL_ARGMAX + 1):
             if not self._argument_map:
                 break
@@ -197,9 +209,12 @@ class FormatString(object):
                 args = self._argument_map.pop(i)
             except KeyError:
                 raise MissingArgument(s, i)
-            self.arguments += [args]
+            arguments += [tuple(args)]
         assert not self._argument_map
         self._argument_map = None
+        self.arguments = tuple(arguments)
+        self._items = tuple(items)
+        self.warnings = tuple(self.warnings)
         for i, args in enumerate(self.arguments, start=1):
             types = frozenset(a.type for a in args)
             if len(types) > 1:
@@ -270,8 +285,7 @@ class FormatString(object):
 
 class Conversion(object):
 
-    type = None
-    integer = None
+    __slots__ = ('_s', 'type', 'integer')
 
     def __init__(self, parent, match):
         i = _info
@@ -467,4 +481,7 @@ class Conversion(object):
             except OverflowError as exc:
                 raise ArgumentRangeError(s, '{}$'.format(exc))
 
+parse_uncached = strformat.uncached_parser(FormatString, '%')
+parse = strformat.cached_parser(parse_uncached, Error)
+
 # vim:ts=4 sts=4 sw=4 et
@@ -26,6 +26,8 @@ import collections
 import functools
 import re
 
+from lib import strformat
+
 _field_name_pattern = r'''
     (?: \d+ | [^\W\d]\w* )
     (?:
@@ -113,6 +115,13 @@ class ArgumentTypeMismatch(Error):
 
 class FormatString(object):
 
+    __slots__ = (
+        '_items',
+        '_argument_map',
+        '_next_arg_index',
+        'argument_map',
+    )
+
     def __init__(self, s):
         self._argument_map = collections.defaultdict(list)
         self._next_arg_index = 0
@@ -142,8 +151,12 @@ class FormatString(object):
                 raise ArgumentTypeMismatch(s, name)
             for arg in args:
                 arg.types = common_types
-        self.argument_map = dict(self._argument_map)
+        self.argument_map = {
+            key: tuple(args)
+            for key, args in self._argument_map.items()
+        }
         self._argument_map = None
+        self._items = tuple(items)
 
     def add_argument(self, name, field):
         if self._argument_map is None:
@@ -180,6 +193,8 @@ class FormatString(object):
 
 class Field(object):
 
+    __slots__ = ('types',)
+
     def __init__(self, parent, match):
         s = match.string[slice(*match.span())]
         name = match.group('name')
@@ -273,9 +288,14 @@ class Field(object):
 
 class NestedField(object):
 
-    types = frozenset({'str', 'int', 'float'})
+    __slots__ = ('parent', 'types')
+    _all_types = frozenset({'str', 'int', 'float'})
 
     def __init__(self, parent):
         self.parent = parent
+        self.types = self._all_types
+
+parse_uncached = strformat.uncached_parser(FormatString, '{}')
+parse = strformat.cached_parser(parse_uncached, Error)
 
 # vim:ts=4 sts=4 sw=4 et
@@ -25,6 +25,8 @@ string format checks: Python's %-formatting
 import collections
 import io
 
+from lib import strformat
+
 class _info:
 
     flags = '#0- +'
@@ -88,6 +90,7 @@ class RedundantLength(Error):
 
 class VariableWidth(object):
 
+    __slots__ = ('parent',)
     type = 'int'
 
     def __init__(self, parent):
@@ -95,6 +98,7 @@ class VariableWidth(object):
 
 class VariablePrecision(object):
 
+    __slots__ = ('parent',)
     type = 'int'
 
     def __init__(self, parent):
@@ -104,6 +108,16 @@ class VariablePrecision(object):
 
 class FormatString(object):
 
+    __slots__ = (
+        '_items',
+        '_seq_arguments',
+        '_map_arguments',
+        'warnings',
+        'seq_arguments',
+        'seq_conversions',
+        'map_arguments',
+    )
+
     def __init__(self, s):
         self._items = items = []
         self._seq_arguments = []
@@ -193,18 +207,23 @@ class FormatString(object):
                 length=length,
                 conv=conv,
             )]
-        self.seq_arguments = self._seq_arguments
-        self.seq_conversions = [
+        self.seq_arguments = tuple(self._seq_arguments)
+        self.seq_conversions = tuple(
             arg
             for arg in self._seq_arguments
             if isinstance(arg, Conversion)
-        ]
+        )
         for key, args in self._map_arguments.items():
             types = frozenset(a.type for a in args)
             if len(types) > 1:
                 raise ArgumentTypeMismatch(s, key, types)
-        self.map_arguments = self._map_arguments
+        self.map_arguments = {
+            key: tuple(args)
+            for key, args in self._map_arguments.items()
+        }
         self._map_arguments = self._seq_arguments = None
+        self._items = tuple(items)
+        self.warnings = tuple(self.warnings)
 
     def add_argument(self, key, arg):
         if self._map_arguments is None:
@@ -235,6 +254,8 @@ class FormatString(object):
 
 class Conversion(object):
 
+    __slots__ = ('type',)
+
     def __init__(self, parent, s, *, key, flags, width, var_width, prec, var_prec, length, conv):
         assert s[-1] == conv, '{0} != {1}'.format(s[-1], conv)
         i = _info
@@ -308,4 +329,7 @@ class Conversion(object):
             except IndexError:
                 raise ArgumentIndexingMixture(s)
 
+parse_uncached = strformat.uncached_parser(FormatString, '%')
+parse = strformat.cached_parser(parse_uncached, Error)
+
 # vim:ts=4 sts=4 sw=4 et
@@ -106,9 +106,26 @@ _is_safe = re.compile(r'\A[A-Za-z0-9_.!<>=-]+\Z').match
 class safestr(str):
     pass
 
+class lazy_safestr(object):
+
+    '''
+    safe string that is computed only when needed
+    '''
+
+    __slots__ = ('_func', '_args')
+
+    def __init__(self, func, *args):
+        self._func = func
+        self._args = args
+
+    def __str__(self):
+        return self._func(*self._args)
+
 def _escape(s):
     if isinstance(s, safestr):
         return s
+    if isinstance(s, lazy_safestr):
+        return str(s)
     if isinstance(s, bytes):
         return repr(s)[1:]
     s = str(s)
@@ -135,6 +152,12 @@ class Tag(object):
             except AttributeError:
                 raise UnknownField(k)
         self.name, self.severity, self.certainty  # pylint: disable=pointless-statement
+        # Tags can be emitted millions of times,
+        # so precompute as much of the formatting as possible:
+        self._priority = self._get_priority()
+        self._head = self._priority + ': '
+        self._plain_tail = ': ' + self.name
+        self._color_tail = None
 
     # pylint: disable=attribute-defined-outside-init
 
@@ -190,6 +213,9 @@ class Tag(object):
         )
 
     def get_priority(self):
+        return self._priority
+
+    def _get_priority(self):
         s = self.severity
         S = severities
         c = self.certainty
@@ -205,16 +231,15 @@ class Tag(object):
 
     def format(self, target, *extra, color=False):
         if color:
-            color_on, color_off = self.get_colors()
+            tail = self._color_tail
+            if tail is None:
+                # The terminal may be initialized only after the tags are
+                # loaded, so the colors cannot be precomputed in __init__().
+                color_on, color_off = self.get_colors()
+                tail = self._color_tail = ': ' + color_on + self.name + color_off
         else:
-            color_on = color_off = ''
-        s = '{prio}: {target}: {on}{tag}{off}'.format(
-            prio=self.get_priority(),
-            target=target,
-            tag=self.name,
-            on=color_on,
-            off=color_off,
-        )
+            tail = self._plain_tail
+        s = self._head + target + tail
         if extra:
             s += ' ' + ' '.join(map(_escape, extra))
         return s
@@ -23,6 +23,7 @@ XML support
 '''
 
 import random
+import re
 import string
 import xml.parsers.expat
 
@@ -40,10 +41,30 @@ _source = '''\
 <i18nspector>&{xe};</i18nspector>
 '''.format(xe=_xe).encode('ASCII')
 
+_source_head = '<!DOCTYPE i18nspector SYSTEM "i18nspector.dtd"><{xe}>'.format(xe=_xe).encode('ASCII')
+_source_tail = '</{xe}>'.format(xe=_xe).encode('ASCII')
+
+# strings that can't contain anything but character data:
+_match_text = re.compile('[^<&\x00-\x08\x0B\x0C\x0E-\x1F\uD800-\uDFFF\uFFFE\uFFFF]*\\Z').match
+
 def check_fragment(s):
     '''
     check if the string could be a well-formed XML fragment
     '''
+    if _match_text(s) and ']]>' not in s:
+        return
+    if _xe not in s:
+        # Parsing the fragment as the content of the root element is
+        # much cheaper than setting up an external entity parser.
+        # But the positions in error messages would be off,
+        # so on failure fall back to the slow path below.
+        parser = xml.parsers.expat.ParserCreate('UTF-8')
+        try:
+            parser.Parse(_source_head + s.encode('UTF-8') + _source_tail, True)
+        except SyntaxError:
+            pass
+        else:
+            return
     def ee_handler(context, base, systemid, publicid):
         assert base is None
         assert systemid == _xe
@@ -0,0 +1,287 @@
+# Copyright © 2015-2017 Jakub Wilk <jwilk@jwilk.net>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+'''
+in-process fuzzing harness
+
+The target function is called in a persistent loop,
+with coverage feedback collected with sys.settrace().
+Inputs that reach new (line, line) edges in lib/ are added to the corpus.
+'''
+
+import argparse
+import hashlib
+import os
+import random
+import sys
+import time
+import traceback
+
+here = os.path.dirname(__file__)
+libdir = os.path.abspath(os.path.join(here, os.pardir, os.pardir, 'lib'))
+libdir = os.path.join(libdir, '')
+
+class Coverage(object):
+
+    '''
+    collect edges, i.e. (code, previous line, line) triples,
+    executed in lib/
+    '''
+
+    def __init__(self, prefix=libdir):
+        self._prefix = prefix
+        self._wanted = {}
+        self.edges = set()
+
+    def _trace_call(self, frame, event, arg):  # pylint: disable=unused-argument
+        code = frame.f_code
+        try:
+            wanted = self._wanted[code]
+        except KeyError:
+            path = os.path.abspath(code.co_filename)
+            wanted = self._wanted[code] = path.startswith(self._prefix)
+        if not wanted:
+            return
+        add = self.edges.add
+        last = -1
+        def trace_line(frame, event, arg):  # pylint: disable=unused-argument
+            nonlocal last
+            if event == 'line':
+                lineno = frame.f_lineno
+                add((code, last, lineno))
+                last = lineno
+            return trace_line
+        return trace_line
+
+    def __enter__(self):
+        self.edges = set()
+        sys.settrace(self._trace_call)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        sys.settrace(None)
+
+class Crash(Exception):
+    pass
+
+def execute(target, data, coverage):
+    '''
+    run the target once;
+    return the set of edges;
+    raise Crash if the target raised an exception
+    '''
+    try:
+        with coverage:
+            target(data)
+    except Exception as exc:  # pylint: disable=broad-except
+        raise Crash(''.join(traceback.format_exception(type(exc), exc, exc.__traceback__)))
+    return coverage.edges
+
+class Mutator(object):
+
+    def __init__(self, rng, dictionary=()):
+        self._rng = rng
+        self._dictionary = [bytes(token) for token in dictionary]
+        self._mutations = [
+            self._flip_bit,
+            self._set_byte,
+            self._insert_byte,
+            self._delete_range,
+            self._duplicate_range,
+        ]
+        if self._dictionary:
+            self._mutations += [self._insert_token] * 2
+
+    def __call__(self, data, corpus):
+        rng = self._rng
+        data = bytearray(data)
+        if len(corpus) > 1 and rng.random() < 0.1:
+            # splice with another input:
+            other = rng.choice(corpus)
+            i = rng.randint(0, len(data))
+            j = rng.randint(0, len(other))
+            data[i:] = other[j:]
+        for i in range(1 << rng.randint(0, 3)):
+            mutate = rng.choice(self._mutations)
+            mutate(data)
+        return bytes(data)
+
+    def _position(self, data):
+        return self._rng.randint(0, max(len(data) - 1, 0))
+
+    def _flip_bit(self, data):
+        if data:
+            data[self._position(data)] ^= 1 << self._rng.randint(0, 7)
+
+    def _set_byte(self, data):
+        if data:
+            data[self._position(data)] = self._rng.choice(b'\x00\x01\x7F\x80\xFF0129')
+
+    def _insert_byte(self, data):
+        data.insert(self._rng.randint(0, len(data)), self._rng.randint(0, 0xFF))
+
+    def _delete_range(self, data):
+        if data:
+            i = self._position(data)
+            del data[i:i + self._rng.randint(1, 8)]
+
+    def _duplicate_range(self, data):
+        if data:
+            i = self._position(data)
+            j = i + self._rng.randint(1, 16)
+            data[i:i] = data[i:j]
+
+    def _insert_token(self, data):
+        i = self._rng.randint(0, len(data))
+        data[i:i] = self._rng.choice(self._dictionary)
+
+def _save(directory, data):
+    os.makedirs(directory, exist_ok=True)
+    name = hashlib.sha1(data).hexdigest()
+    with open(os.path.join(directory, name), 'wb') as file:
+        file.write(data)
+
+def _read_inputs(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(os.listdir(path))
+            paths = [os.path.join(path, name) for name in names]
+        else:
+            paths = [path]
+        for path in paths:
+            with open(path, 'rb') as file:
+                yield file.read()
+
+def minimize(target, inputs, coverage=None):
+    '''
+    return the smallest inputs that together cover all the edges
+    covered by the original inputs
+    '''
+    if coverage is None:
+        coverage = Coverage()
+    edges = {}
+    for data in inputs:
+        try:
+            edges[data] = frozenset(execute(target, data, coverage))
+        except Crash:
+            continue
+    covered = set()
+    result = []
+    for data in sorted(edges, key=len):
+        if edges[data] - covered:
+            covered |= edges[data]
+            result += [data]
+    return result
+
+class Fuzzer(object):
+
+    def __init__(self, target, corpus, *, output=None, dictionary=(), seed=None):
+        self._target = target
+        self._rng = random.Random(seed)
+        self._mutate = Mutator(self._rng, dictionary)
+        self._coverage = Coverage()
+        self._output = output
+        self.corpus = []
+        self.edges = set()
+        self.execs = 0
+        self.crashes = 0
+        for data in corpus:
+            self._run(data)
+        if not self.corpus:
+            self.corpus = [b'']
+
+    def _run(self, data):
+        self.execs += 1
+        try:
+            edges = execute(self._target, data, self._coverage)
+        except Crash as exc:
+            self.crashes += 1
+            if self._output is not None:
+                _save(os.path.join(self._output, 'crashes'), data)
+            else:
+                print(exc, file=sys.stderr)
+            return
+        if edges - self.edges:
+            self.edges |= edges
+            self.corpus += [data]
+            if self._output is not None:
+                _save(os.path.join(self._output, 'queue'), data)
+
+    def _report(self, start):
+        elapsed = max(time.monotonic() - start, 1e-9)
+        print(
+            'execs: {n} ({rate:.0f}/s), corpus: {c}, edges: {e}, crashes: {x}'.format(
+                n=self.execs,
+                rate=self.execs / elapsed,
+                c=len(self.corpus),
+                e=len(self.edges),
+                x=self.crashes,
+            ),
+            file=sys.stderr
+        )
+
+    def run(self, *, max_execs=None, max_time=None, report_interval=1):
+        start = last_report = time.monotonic()
+        self.execs = 0
+        while max_execs is None or self.execs < max_execs:
+            data = self._rng.choice(self.corpus)
+            data = self._mutate(data, self.corpus)
+            self._run(data)
+            now = time.monotonic()
+            if max_time is not None and now - start >= max_time:
+                break
+            if now - last_report >= report_interval:
+                self._report(start)
+                last_report = now
+        self._report(start)
+
+def main(target, *, default_input=(), dictionary=()):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--in-process', action='store_true', help='fuzz in-process, without AFL')
+    ap.add_argument('--minimize', action='store_true', help='minimize the corpus and exit')
+    ap.add_argument('-o', '--output', metavar='DIR', help='save new inputs and crashes in DIR')
+    ap.add_argument('--max-time', metavar='SECONDS', type=float)
+    ap.add_argument('--max-execs', metavar='N', type=int)
+    ap.add_argument('--seed', metavar='N', type=int)
+    ap.add_argument('inputs', metavar='INPUT', nargs='*', help='input file or directory')
+    options = ap.parse_args()
+    if not (options.in_process or options.minimize):
+        import afl  # pylint: disable=import-error
+        while afl.loop(max=1000):
+            data = sys.stdin.buffer.read()  # pylint: disable=no-member
+            target(data)
+        os._exit(0)  # pylint: disable=protected-access
+    if options.minimize and options.output is None:
+        ap.error('--minimize requires --output')
+    corpus = list(_read_inputs(options.inputs or default_input))
+    if options.minimize:
+        corpus = minimize(target, corpus)
+        for data in corpus:
+            _save(options.output, data)
+        print('corpus: {n}'.format(n=len(corpus)), file=sys.stderr)
+        return
+    fuzzer = Fuzzer(target, corpus,
+        output=options.output,
+        dictionary=dictionary,
+        seed=options.seed,
+    )
+    fuzzer.run(max_execs=options.max_execs, max_time=options.max_time)
+
+# vim:ts=4 sts=4 sw=4 et
@@ -1,4 +1,4 @@
-# Copyright © 2015 Jakub Wilk <jwilk@jwilk.net>
+# Copyright © 2015-2017 Jakub Wilk <jwilk@jwilk.net>
 #
 # Permission is hereby granted, free of charge, to any person obtaining a copy
 # of this software and associated documentation files (the “Software”), to deal
@@ -18,35 +18,40 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import glob
 import os
 import sys
 
-import afl
-
 sys.path[0] += '/../../..'
 
 import tests.tools as tools
 import lib.moparser as M
+from tests import fuzzing
 
-def parser_for_bytes(data):
-    with tools.temporary_file(suffix='.mo') as file:
-        file.write(data)
-        file.flush()
-        return M.Parser(file.name)
+here = os.path.dirname(__file__)
 
-def test(data):
+def parser_for_file(file, data):
+    file.seek(0)
+    file.truncate()
+    file.write(data)
+    file.flush()
+    return M.Parser(file.name)
+
+def test(file, data):
     try:
-        parser_for_bytes(data)
+        parser_for_file(file, data)
     except M.SyntaxError:
         return
     except UnicodeDecodeError:
         pass
 
 def main():
-    while afl.loop(max=1000):
-        data = sys.stdin.buffer.read()  # pylint: disable=no-member
-        test(data)
-    os._exit(0)  # pylint: disable=protected-access
+    # The same temporary file is reused for every input:
+    with tools.temporary_file(suffix='.mo') as file:
+        fuzzing.main(
+            lambda data: test(file, data),
+            default_input=glob.glob(os.path.join(here, '..', '..', 'blackbox_tests', '*.mo')),
+        )
 
 if __name__ == '__main__':
     main()
@@ -1,4 +1,4 @@
-# Copyright © 2015 Jakub Wilk <jwilk@jwilk.net>
+# Copyright © 2015-2017 Jakub Wilk <jwilk@jwilk.net>
 #
 # Permission is hereby granted, free of charge, to any person obtaining a copy
 # of this software and associated documentation files (the “Software”), to deal
@@ -21,13 +21,15 @@
 import os
 import sys
 
-import afl
-
 sys.path[0] += '/../../..'
 
 from lib import gettext
+from tests import fuzzing
+
+here = os.path.dirname(__file__)
 
-def test(s):
+def test(data):
+    s = data.decode('UTF-8', 'replace')
     try:
         (n, expr) = gettext.parse_plural_forms(s)
     except gettext.PluralFormsSyntaxError:
@@ -41,12 +43,18 @@ def test(s):
         except ZeroDivisionError:
             return
 
+dictionary = [
+    b'nplurals=', b'plural=', b';', b'n', b'0', b'1', b'10', b'100',
+    b'4294967295', b'(', b')', b'?', b':', b'!',
+    b'&&', b'||', b'==', b'!=', b'<', b'<=', b'>', b'>=',
+    b'+', b'-', b'*', b'/', b'%',
+]
+
 def main():
-    while afl.loop(max=1000):
-        s = sys.stdin.buffer.read()  # pylint: disable=no-member
-        s = s.decode('UTF-8', 'replace')
-        test(s)
-    os._exit(0)  # pylint: disable=protected-access
+    fuzzing.main(test,
+        default_input=[os.path.join(here, 'input')],
+        dictionary=dictionary,
+    )
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,56 @@
+# Copyright © 2017 Jakub Wilk <jwilk@jwilk.net>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from nose.tools import (
+    assert_equal,
+    assert_is,
+    assert_is_none,
+)
+
+import lib.check as M
+
+class test_msgid_table:
+
+    def test_facts(self):
+        table = M.MsgidTable()
+        facts = table.get_facts('\nA quick brown fox\x7F')
+        assert_is(table.get_facts('\nA quick brown fox\x7F'), facts)
+        assert_equal(facts.leading_lf, True)
+        assert_equal(facts.trailing_lf, False)
+        assert_equal(facts.unusual_characters, {'\x7F'})
+
+    def test_xml_error(self):
+        table = M.MsgidTable()
+        assert_is_none(table.get_xml_error('A quick <b>brown</b> fox'))
+        assert_equal(
+            table.get_xml_error('A quick <b>brown fox'),
+            'asynchronous entity: line 1, column 20',
+        )
+
+    def test_maxsize(self):
+        table = M.MsgidTable(maxsize=2)
+        facts = table.get_facts('fox')
+        table.get_facts('dog')
+        assert_is(table.get_facts('fox'), facts)
+        table.get_facts('cat')
+        # 'dog' was the least recently used one, so it was evicted:
+        assert_equal(list(table._facts), ['fox', 'cat'])  # pylint: disable=protected-access
+
+# vim:ts=4 sts=4 sw=4 et
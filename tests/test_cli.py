@@ -0,0 +1,135 @@
+# Copyright © 2017 Jakub Wilk <jwilk@jwilk.net>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import subprocess as ipc
+import sys
+
+from nose.tools import (
+    assert_equal,
+    assert_in,
+    assert_not_equal,
+    assert_not_in,
+)
+
+from . import tools
+
+here = os.path.dirname(__file__)
+prog = os.path.join(here, os.pardir, 'i18nspector')
+
+header = r'''
+msgid ""
+msgstr ""
+"Project-Id-Version: Gizmo Enhancer 1.0\n"
+"Report-Msgid-Bugs-To: gizmoenhancer@jwilk.net\n"
+"POT-Creation-Date: 2012-11-01 14:42+0100\n"
+"PO-Revision-Date: {date}\n"
+"Last-Translator: Jakub Wilk <jwilk@jwilk.net>\n"
+"Language-Team: {team} <{lang}@li.org>\n"
+"Language: {lang}\n"
+"MIME-Version: 1.0\n"
+"Content-Type: text/plain; charset=UTF-8\n"
+"Content-Transfer-Encoding: 8bit\n"
+'''
+
+messages = r'''
+#. type: Content of: <refentry><refsection><para>
+msgid "A quick brown <b>fox</b> jumps over the lazy dog."
+msgstr "{0}"
+
+#, c-format
+msgid "A quick brown %s jumps over the lazy dog.\n"
+msgstr "{1}"
+'''
+
+project = {
+    'gizmo.pot': (
+        '#, fuzzy' +
+        header.format(team='LANGUAGE', lang='', date='YEAR-MO-DA HO:MI+ZONE') +
+        messages.format('', '')
+    ),
+    'la.po': (
+        header.format(team='Latin', lang='la', date='2012-11-01 14:42+0100') +
+        messages.format(
+            'Sic fugiens, <b>dux<b>, zelotypos, quam Karus haberis.',
+            'Sic fugiens, %d, zelotypos, quam Karus haberis.',
+        )
+    ),
+    'pl.po': (
+        header.format(team='Polish', lang='pl', date='2012-11-01 14:42+0100') +
+        messages.format(
+            'Pchnąć w tę łódź <b>jeża</b> lub ośm skrzyń fig.',
+            'Pchnąć w tę łódź %s lub ośm skrzyń fig.\\n',
+        )
+    ),
+}
+
+def run_i18nspector(*args):
+    commandline = [sys.executable, prog]
+    commandline += args
+    env = dict(os.environ, PYTHONIOENCODING='UTF-8')
+    child = ipc.Popen(commandline, stdout=ipc.PIPE, stderr=ipc.PIPE, env=env)
+    (stdout, stderr) = child.communicate()
+    return (child.returncode, stdout.decode('UTF-8'), stderr.decode('UTF-8'))
+
+def _test_project(*options):
+    with tools.temporary_directory() as tmpdir:
+        paths = []
+        for filename, contents in sorted(project.items()):
+            path = os.path.join(tmpdir, filename)
+            with open(path, 'wt', encoding='UTF-8') as file:
+                file.write(contents)
+            paths += [path]
+        paths.sort(key=lambda p: not p.endswith('.pot'))
+        (rc, expected, stderr) = run_i18nspector(*paths)
+        assert_equal(rc, 0, stderr)
+        assert_in('malformed-xml', expected)
+        assert_in('c-format-string-argument-type-mismatch', expected)
+        (rc, stdout, stderr) = run_i18nspector('--project', tmpdir, *options)
+        assert_equal(rc, 0, stderr)
+        assert_equal(stdout, expected)
+
+def test_project():
+    _test_project()
+
+def test_project_jobs():
+    _test_project('-j', '2')
+
+def test_project_not_directory():
+    with tools.temporary_file(suffix='.po') as file:
+        for path in [file.name, file.name + '.nonexistent']:
+            (rc, stdout, stderr) = run_i18nspector('--project', path)
+            assert_not_equal(rc, 0)
+            assert_equal(stdout, '')
+            assert_in('not a directory', stderr)
+            assert_not_in('Traceback', stderr)
+
+def test_project_and_files():
+    with tools.temporary_directory() as tmpdir:
+        path = os.path.join(tmpdir, 'la.po')
+        with open(path, 'wt', encoding='UTF-8') as file:
+            file.write(project['la.po'])
+        (rc, stdout, stderr) = run_i18nspector('--project', tmpdir, path)
+        assert_not_equal(rc, 0)
+        assert_equal(stdout, '')
+        assert_in('cannot be used together', stderr)
+        assert_not_in('Traceback', stderr)
+
+# vim:ts=4 sts=4 sw=4 et
@@ -18,16 +18,22 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import codecs
 import curses.ascii
+import io
 import sys
 
 import lib.encodings as E
+import lib.iconv
+import lib.ling
 
 import nose
 from nose.tools import (
     assert_equal,
     assert_false,
+    assert_is,
     assert_is_none,
+    assert_is_not_none,
     assert_not_in,
     assert_raises,
     assert_true,
@@ -104,6 +110,100 @@ class test_ascii_compatibility:
     def test_missing(self):
         self._test_missing('eggs')
 
+class test_encoding_info:
+
+    def test_portable(self):
+        def t(encoding):
+            info = E.get_encoding_info(encoding)
+            assert_equal(info.name, encoding)
+            assert_is_not_none(info.codec)
+            assert_true(info.ascii_compatible)
+            assert_true(info.portable)
+            assert_is_none(info.portable_name)
+        for encoding in E.get_portable_encodings():
+            yield t, encoding
+
+    def test_non_portable(self):
+        info = E.get_encoding_info('latin2')
+        assert_true(info.ascii_compatible)
+        assert_false(info.portable)
+        assert_equal(info.portable_name, 'ISO-8859-2')
+
+    def test_incompatible(self):
+        info = E.get_encoding_info('UTF-16')
+        assert_is_not_none(info.codec)
+        assert_false(info.ascii_compatible)
+
+    def test_missing(self):
+        info = E.get_encoding_info('eggs')
+        assert_is_none(info.codec)
+        assert_false(info.ascii_compatible)
+        assert_is_none(info.portable_name)
+
+    def test_non_text(self):
+        info = E.get_encoding_info('hex_codec')
+        assert_is_none(info.codec)
+
+    def test_cached(self):
+        info = E.get_encoding_info('ISO-8859-2')
+        assert_is(E.get_encoding_info('ISO-8859-2'), info)
+
+def _get_language_characters():
+    # pylint: disable=protected-access
+    for section in lib.ling._primary_languages.values():
+        for key, value in section.items():
+            if key == 'characters' or key.startswith('characters@'):
+                for ch in value.split():
+                    yield ch.strip('()')
+    # pylint: enable=protected-access
+
+class test_character_coverage:
+
+    def test_portable(self):
+        characters = sorted(set(_get_language_characters()))
+        def t(encoding):
+            coverage = E.get_character_coverage(encoding)
+            for ch in characters:
+                try:
+                    ch.encode(encoding)
+                except UnicodeEncodeError:
+                    expected = False
+                else:
+                    expected = True
+                assert_equal(coverage.is_representable(ch), expected)
+        for encoding in E.get_portable_encodings():
+            yield t, encoding
+
+    def test_normalization(self):
+        coverage = E.get_character_coverage('iso_8859-2')
+        assert_true(coverage.is_representable('\u0141'))
+        assert_false(coverage.is_representable('\u00C0'))
+
+    def test_unknown_encoding(self):
+        coverage = E.get_character_coverage('ISO-8859-16')
+        assert_is_none(coverage)
+
+    def test_unknown_character(self):
+        coverage = E.get_character_coverage('UTF-8')
+        with assert_raises(KeyError):
+            coverage.is_representable('\U0010FFFD')
+
+class test_collect_decoding_errors:
+
+    def test_strict(self):
+        assert_equal(E.get_decoding_error_handler(), 'strict')
+
+    def test_collect(self):
+        b = b'\xFFa\xFEb'
+        with E.collect_decoding_errors() as log:
+            u = b.decode('ASCII', E.get_decoding_error_handler())
+        assert_equal(u, '\xFFa\xFEb')
+        assert_equal(
+            [(exc.start, exc.end) for exc in log],
+            [(0, 1), (2, 3)]
+        )
+        assert_equal(E.get_decoding_error_handler(), 'strict')
+
 class test_get_character_name:
 
     def test_latin(self):
@@ -234,6 +334,14 @@ class test_extra_encoding:
         with assert_raises(UnicodeDecodeError):
             b.decode('KOI8-T')
 
+    @tools.fork_isolation
+    def test_8b_alias(self):
+        E.install_extra_encodings()
+        b = self._viscii_bytes
+        for encoding in ['viscii', 'Viscii']:
+            u = b.decode(encoding)
+            assert_equal(u, self._viscii_unicode)
+
     _euc_tw_unicode = '\u4E2D\u6587'
     _euc_tw_bytes = b'\xC4\xE3\xC5\xC6'
 
@@ -265,4 +373,70 @@ class test_extra_encoding:
         with assert_raises(UnicodeDecodeError):
             b.decode('EUC-TW')
 
+    @staticmethod
+    def _decode_incrementally(b, encoding):
+        decoder = codecs.getincrementaldecoder(encoding)()
+        u = ''.join(decoder.decode(b[i:i+1]) for i in range(len(b)))
+        u += decoder.decode(b'', final=True)
+        return u
+
+    @tools.fork_isolation
+    def test_8b_incremental_decode(self):
+        E.install_extra_encodings()
+        u = self._decode_incrementally(self._viscii_bytes, 'VISCII')
+        assert_equal(u, self._viscii_unicode)
+
+    @tools.fork_isolation
+    def test_8b_stream_decode(self):
+        E.install_extra_encodings()
+        reader = codecs.getreader('VISCII')(io.BytesIO(self._viscii_bytes))
+        assert_equal(reader.read(), self._viscii_unicode)
+
+    @tools.fork_isolation
+    def test_mb_incremental_decode(self):
+        E.install_extra_encodings()
+        u = self._decode_incrementally(self._euc_tw_bytes, 'EUC-TW')
+        assert_equal(u, self._euc_tw_unicode)
+
+    @tools.fork_isolation
+    def test_mb_incremental_decode_error(self):
+        E.install_extra_encodings()
+        with assert_raises(UnicodeDecodeError):
+            self._decode_incrementally(self._euc_tw_bytes[:-1], 'EUC-TW')
+
+    @tools.fork_isolation
+    def test_mb_stream_decode(self):
+        E.install_extra_encodings()
+        reader = codecs.getreader('EUC-TW')(io.BytesIO(self._euc_tw_bytes))
+        assert_equal(reader.read(), self._euc_tw_unicode)
+
+    @tools.fork_isolation
+    def test_mb_stream_decode_chunks(self):
+        E.install_extra_encodings()
+        reader = codecs.getreader('EUC-TW')(io.BytesIO(self._euc_tw_bytes))
+        u = ''
+        while True:
+            s = reader.read(1)
+            if not s:
+                break
+            u += s
+        assert_equal(u, self._euc_tw_unicode)
+
+    @tools.fork_isolation
+    def test_mb_stream_decode_error(self):
+        E.install_extra_encodings()
+        reader = codecs.getreader('EUC-TW')(io.BytesIO(self._euc_tw_bytes[:-1]))
+        with assert_raises(UnicodeDecodeError):
+            reader.read()
+
+    @tools.fork_isolation
+    def test_mb_stream_decode_cli(self):
+        lib.iconv._decode = lib.iconv._decode_cli  # pylint: disable=protected-access
+        E.install_extra_encodings()
+        reader = codecs.getreader('EUC-TW')(io.BytesIO(self._euc_tw_bytes))
+        assert_equal(reader.read(), self._euc_tw_unicode)
+        reader = codecs.getreader('EUC-TW')(io.BytesIO(self._euc_tw_bytes[:-1]))
+        with assert_raises(UnicodeDecodeError):
+            reader.read()
+
 # vim:ts=4 sts=4 sw=4 et
@@ -18,20 +18,26 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import ast
 import datetime
 
 from nose.tools import (
     assert_equal,
     assert_false,
+    assert_in,
+    assert_is,
     assert_is_instance,
     assert_is_none,
     assert_is_not_none,
     assert_less,
+    assert_not_equal,
+    assert_not_in,
     assert_raises,
     assert_true,
 )
 
 import lib.gettext as M
+import lib.intexpr
 
 class test_header_fields:
 
@@ -224,9 +230,31 @@ class test_plural_exp:
         self.t(s, 0, 7)
         self.t(s, 1, 3)
 
+    def test_conditional_associativity(self):
+        self.t('n ? 1 : n ? 2 : 3', 1, 1)
+        self.t('n ? 1 : n ? 2 : 3', 0, 3)
+
+    def test_conditional_precedence(self):
+        self.t('n || 0 ? 5 : 7', 1, 5)
+        self.t('0 ? 5 : n + 7', 1, 8)
+
+    def test_bool_precedence(self):
+        self.t('n || n && 0', 1, 1)
+        self.t('n == 1 && n', 1, 1)
+
+    def test_arithmetic_precedence(self):
+        self.t('n + 2 * 3 - 4 / 2', 1, 5)
+        self.t('n - 1 - 1', 5, 3)
+
     def test_nested_conditional(self):
         self.t('(2 ? 3 : 7) ? 23 : 37')
 
+    def test_deeply_nested(self):
+        # too deep for the Python compiler
+        s = '!' * 250 + 'n'
+        self.t(s, 0, 0)
+        self.t(s, 5, 1)
+
     def test_badly_nested_conditional(self):
         with assert_raises(self.error):
             self.t('2 ? (3 : 7 ? ) : 23')
@@ -289,6 +317,10 @@ class test_plural_exp:
         with assert_raises(self.error):
             self.t('*42')
 
+    def test_lone_eq(self):
+        with assert_raises(self.error):
+            self.t('n = 1')
+
     def test_exotic_whitespace(self):
         with assert_raises(self.error):
             self.t('6 *\xA07')
@@ -299,6 +331,159 @@ class test_plural_exp:
         with assert_raises(self.error):
             self.t(' ')
 
+class test_evaluate_range:
+
+    def t(self, s, start, stop, *, bits=32):
+        f = M.parse_plural_expression(s)
+        return f.evaluate_range(start, stop, bits=bits)
+
+    def test_ok(self):
+        r = self.t('n % 3', 2, 9)
+        assert_equal(r.values, [2, 0, 1, 2, 0, 1, 2])
+        assert_is_none(r.error)
+        assert_equal(r.preimage, {0: [3, 6], 1: [4, 7], 2: [2, 5, 8]})
+        assert_equal(r.histogram, {0: 2, 1: 2, 2: 3})
+
+    def test_div_by_0(self):
+        r = self.t('6 / (n - 3)', 5, 10)
+        assert_equal(r.values, [3, 2, 1, 1, 1])
+        assert_is_none(r.error)
+        r = self.t('6 / (3 - n)', 0, 10)
+        assert_equal(r.values, [2, 3, 6])
+        (n, exc) = r.error
+        assert_equal(n, 3)
+        assert_is_instance(exc, ZeroDivisionError)
+
+    def test_overflow(self):
+        r = self.t('n - 2', 0, 10)
+        assert_equal(r.values, [])
+        (n, exc) = r.error
+        assert_equal(n, 0)
+        assert_is_instance(exc, OverflowError)
+
+    def test_var_overflow(self):
+        r = self.t('n', 254, 258, bits=8)
+        assert_equal(r.values, [254, 255])
+        (n, exc) = r.error
+        assert_equal(n, 256)
+        assert_is_instance(exc, OverflowError)
+
+class test_preimage:
+
+    def t(self, s, *, bits=32, limit=200):
+        f = M.parse_plural_expression(s)
+        return f.preimage(bits=bits, limit=limit)
+
+    def test_const(self):
+        p = self.t('0')
+        assert_true(p.complete)
+        assert_equal(p.ranges, {0: [range(0, 1 << 32)]})
+
+    def test_prefix(self):
+        p = self.t('n == 1 ? 0 : n >= 2 && n <= 4 ? 1 : 2')
+        assert_true(p.complete)
+        assert_equal(p.ranges, {
+            0: [range(1, 2)],
+            1: [range(2, 5)],
+            2: [range(0, 1), range(5, 1 << 32)],
+        })
+
+    def test_periodic(self):
+        p = self.t('n % 3', bits=8)
+        assert_true(p.complete)
+        assert_equal(p.ranges, {
+            0: [range(0, 256, 3)],
+            1: [range(1, 256, 3)],
+            2: [range(2, 256, 3)],
+        })
+
+    def test_real_world(self):
+        p = self.t('n%10==1 && n%100!=11 ? 0 : n != 0 ? 1 : 2')
+        assert_true(p.complete)
+        assert_equal(p.ranges[2], [range(0, 1)])
+        assert_equal(len(p.ranges[0]), 9)
+        assert_in(1000001, p.ranges[0][0])
+        assert_not_in(11, p.ranges[0][0])
+
+    def test_unknown_period(self):
+        p = self.t('n', limit=5)
+        assert_false(p.complete)
+        assert_equal(p.ranges, {i: [range(i, i + 1)] for i in range(5)})
+
+    def test_long_period(self):
+        p = self.t('n % 7', limit=5)
+        assert_false(p.complete)
+        assert_equal(sorted(p.ranges), [0, 1, 2, 3, 4])
+
+    def test_error(self):
+        p = self.t('6 / (3 - n) + n % 5')
+        assert_false(p.complete)
+        assert_equal(p.ranges, {2: [range(0, 1)], 4: [range(1, 2)], 8: [range(2, 3)]})
+
+class test_interner:
+
+    def t(self, s, *, bits=32):
+        node = lib.intexpr.Parser().parse(s)._node
+        dag = lib.intexpr.Interner(node, bits=bits)()
+        [root] = ast.iter_child_nodes(dag)
+        return root
+
+    def test_shared(self):
+        root = self.t('n % 10 == 1 ? n % 10 : n % 100')
+        assert_is(root.test.left, root.body)
+        assert_is(root.body.left, root.orelse.left)
+
+    def test_fold(self):
+        root = self.t('2 * 3 + 1')
+        assert_equal(root.n, 7)
+        root = self.t('n + (1 ? 2 : n / 0)')
+        assert_equal(root.right.n, 2)
+        root = self.t('0 && n / 0')
+        assert_equal(root.n, 0)
+        root = self.t('1 || n / 0')
+        assert_equal(root.n, 1)
+        root = self.t('!(6 / 3 == 2) || n')
+        assert_is_instance(root, ast.BoolOp)
+        assert_equal(root.values[0].n, 0)
+
+    def test_no_fold(self):
+        root = self.t('n + 1 / 0')
+        assert_is_instance(root.right, ast.BinOp)
+        root = self.t('n + (200 + 100)', bits=8)
+        assert_is_instance(root.right, ast.BinOp)
+        root = self.t('256 ? 0 : 1', bits=8)
+        assert_is_instance(root, ast.IfExp)
+
+    def test_evaluate(self):
+        f = M.parse_plural_expression('n % 10 == 1 ? 6 / (n % 10 - 1) : n % 100 + 1')
+        assert_equal(f(2), 3)
+        assert_equal(f(42), 43)
+        with assert_raises(ZeroDivisionError):
+            f(11)
+
+class test_fingerprint:
+
+    def t(self, s, *, limit=200):
+        f = M.parse_plural_expression(s)
+        return f.fingerprint(limit=limit)
+
+    def test_minimal(self):
+        assert_equal(self.t('n != 1'), (2, (1, 0, 1)))
+        assert_equal(self.t('0'), (0, (0,)))
+        assert_equal(self.t('n % 4 == n % 2'), (0, (1, 1, 0, 0)))
+        assert_equal(self.t('n % 6 ? n % 3 : 7'), (0, (7, 1, 2, 0, 1, 2)))
+
+    def test_equivalent(self):
+        assert_equal(self.t('n != 1'), self.t('n == 1 ? 0 : 1'))
+        assert_equal(self.t('n > 1'), self.t('n >= 2 || 0'))
+        assert_equal(self.t('n % 2'), self.t('n % 4 % 2'))
+        assert_not_equal(self.t('n % 2'), self.t('n % 3'))
+
+    def test_none(self):
+        assert_is_none(self.t('n'))
+        assert_is_none(self.t('n % 7', limit=5))
+        assert_is_none(self.t('6 / (n % 3)'))
+
 class test_codomain:
 
     def t(self, s, min_, max_=None):
@@ -613,6 +798,26 @@ class test_period:
         self.t('n==1 ? 0 : n==2 ? 1 : 2', 3, 1)
         self.t('n==1 ? 3 : n%10==1 && n%100!=11 ? 0 : n%10>=2 && n%10<=4 && (n%100<10 || n%100>=20) ? 1 : 2', 2, 100)
 
+class test_complexity:
+
+    def t(self, s):
+        return M.parse_plural_expression(s).complexity()
+
+    def test_simple(self):
+        c = self.t('n != 1')
+        assert_equal(c.nodes, 3)
+        assert_equal(c.depth, 2)
+
+    def test_deep(self):
+        c = self.t(' + '.join(['n'] * 5000))
+        assert_equal(c.nodes, 9999)
+        assert_equal(c.depth, 5000)
+
+    def test_too_deep(self):
+        s = '(' * 5000 + 'n' + ')' * 5000
+        with assert_raises(M.PluralExpressionComplexityError):
+            M.parse_plural_expression(s)
+
 class test_plural_forms:
 
     error = M.PluralFormsSyntaxError
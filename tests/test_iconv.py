@@ -20,8 +20,10 @@
 
 from nose.tools import (
     assert_equal,
+    assert_raises,
 )
 
+import lib.encodings
 import lib.iconv as M
 
 class _test:
@@ -37,6 +39,12 @@ class _test:
         u = M.decode(self.b, self.e)
         assert_equal(u, self.u)
 
+    def test_decode_partial(self):
+        for i in range(len(self.b) + 1):
+            (u, n) = M.decode_partial(self.b[:i], self.e)
+            assert_equal(u, self.u[:len(u)])
+            assert_equal(M.decode(self.b[:n], self.e), u)
+
 class test_iso2(_test):
     u = 'Żrą łódź? Część miń!'
     b = b'\xAFr\xB1 \xB3\xF3d\xBC? Cz\xEA\xB6\xE6 mi\xF1!'
@@ -47,4 +55,51 @@ class test_tcvn(_test):
     b = b'Do b\xB9ch kim r\xCAt qu\xFD, s\xCF \xAE\xD3 l\xBEp v\xAB x\xAD\xACng'
     e = 'TCVN-5712'
 
+class test_euc_tw(_test):
+    u = '中文'
+    b = b'\xC4\xE3\xC5\xC6'
+    e = 'EUC-TW'
+
+def test_decode_error():
+    with assert_raises(UnicodeDecodeError) as cm:
+        M.decode(b'\xC4\xE3\xFF\xFF ab', 'EUC-TW')
+    exc = cm.exception
+    assert_equal((exc.start, exc.end), (2, 4))
+
+def test_decode_error_handler():
+    b = b'\xC4\xE3\xFF\xFF ab\xC5\xC6\xC5'
+    u = M.decode(b, 'EUC-TW', 'replace')
+    assert_equal(u, '\u4E2D\uFFFD ab\u6587\uFFFD')
+    u = M.decode(b, 'EUC-TW', 'backslashreplace')
+    assert_equal(u, '\u4E2D\\xff\\xff ab\u6587\\xc5')
+
+def _with_decode_cli(f):
+    def wrapper():
+        orig_decode = M._decode  # pylint: disable=protected-access
+        M._decode = M._decode_cli  # pylint: disable=protected-access
+        try:
+            f()
+        finally:
+            M._decode = orig_decode  # pylint: disable=protected-access
+    wrapper.__name__ = f.__name__
+    return wrapper
+
+@_with_decode_cli
+def test_decode_cli():
+    with lib.encodings.collect_decoding_errors() as log:
+        u = M.decode(b'\xC4\xE3\xC5\xC6', 'EUC-TW', lib.encodings.get_decoding_error_handler())
+    assert_equal(u, '\u4E2D\u6587')
+    assert_equal(log, [])
+
+@_with_decode_cli
+def test_decode_cli_error_handler():
+    b = b'\xC4\xE3\xFF\xFF ab'
+    u = M.decode(b, 'EUC-TW', 'replace')
+    assert_equal(u, '\uFFFD')
+    with lib.encodings.collect_decoding_errors() as log:
+        u = M.decode(b, 'EUC-TW', lib.encodings.get_decoding_error_handler())
+    assert_equal(u, b.decode('ISO-8859-1'))
+    assert_equal(len(log), 1)
+    assert_equal((log[0].start, log[0].end), (0, len(b)))
+
 # vim:ts=4 sts=4 sw=4 et
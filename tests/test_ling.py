@@ -19,6 +19,7 @@
 # SOFTWARE.
 
 import lib.encodings
+import lib.gettext
 import lib.ling
 
 import nose
@@ -296,6 +297,84 @@ class test_get_plural_forms:
     def test_not_found(self):
         assert_is_none(self.t('ry'))
 
+class test_get_plural_rules:
+
+    def t(self, lang):
+        lang = L.parse_language(lang)
+        return lang.get_plural_rules()
+
+    def test_found_ll(self):
+        rules = self.t('el')
+        assert_equal(rules[1], ())
+        [rule] = rules[2]
+        assert_equal(rule.plural_forms, 'nplurals=2; plural=n != 1;')
+        assert_equal(rule.n, 2)
+        assert_equal(rule.values[:3], [1, 0, 1])
+        assert_equal(len(rule.values), L.plural_rule_values_limit)
+
+    def test_shared(self):
+        assert_is(self.t('el'), self.t('el_GR'))
+        assert_equal(self.t('el_GR').language, 'el')
+        [el_rule] = self.t('el')[2]
+        [de_rule] = self.t('de')[2]
+        assert_is(el_rule, de_rule)
+
+    def test_consistency(self):
+        for lang in L.get_primary_languages():
+            plural_forms = L.parse_language(lang).get_plural_forms()
+            rules = self.t(lang)
+            if plural_forms is None:
+                assert_is_none(rules)
+                continue
+            for s in plural_forms:
+                [n, _] = lib.gettext.parse_plural_forms(s)
+                assert_in(s, [rule.plural_forms for rule in rules[n]])
+
+    def test_not_found(self):
+        assert_is_none(self.t('ry'))
+
+class test_get_languages_for_plural_forms:
+
+    def t(self, n, s):
+        expr = lib.gettext.parse_plural_expression(s)
+        return self._t(n, expr)
+
+    def _t(self, n, expr):
+        return [str(lang) for lang in L.get_languages_for_plural_forms(n, expr)]
+
+    def test_found(self):
+        languages = self.t(2, '(n == 1) ? 0 : 1')
+        assert_in('de', languages)
+        assert_not_in('fr', languages)
+        languages = self.t(2, 'n >= 2')
+        assert_in('fr', languages)
+        assert_in('pt_BR', languages)
+
+    def test_nplurals(self):
+        assert_equal(self.t(3, 'n != 1'), [])
+
+    def test_not_found(self):
+        assert_equal(self.t(2, 'n % 7 == 5'), [])
+
+    def test_no_fingerprint(self):
+        assert_equal(self.t(2, 'n / 1000000'), [])
+
+    def test_codes(self):
+        [rule] = L.parse_language('fr').get_plural_rules()[2]
+        codes = L.get_language_codes_for_plural_rule(2, rule.fingerprint)
+        assert_in('fr', codes)
+        assert_not_in('de', codes)
+        assert_equal(L.get_language_codes_for_plural_rule(3, rule.fingerprint), ())
+
+    def test_consistency(self):
+        for lang in L.get_primary_languages():
+            plural_forms = L._get_plural_forms(lang)  # pylint: disable=protected-access
+            if plural_forms is None:
+                continue
+            for s in plural_forms:
+                [n, expr] = lib.gettext.parse_plural_forms(s)
+                assert_in(lang, self._t(n, expr))
+
 class test_principal_territory:
 
     def test_found_2(self):
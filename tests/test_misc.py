@@ -29,6 +29,7 @@ import lib.misc as M
 from nose.tools import (
     assert_almost_equal,
     assert_equal,
+    assert_false,
     assert_is_instance,
     assert_is_not_none,
     assert_raises,
@@ -142,6 +143,12 @@ def test_namespace():
     ns.eggs = 37
     assert_equal(ns.eggs, 37)
 
+def test_is_ascii():
+    assert_true(M.is_ascii(''))
+    assert_true(M.is_ascii('eggs\x7F'))
+    assert_false(M.is_ascii('eggs\x80'))
+    assert_false(M.is_ascii('\u20AC'))
+
 def test_throwaway_tempdir():
     with M.throwaway_tempdir('test'):
         d = tempfile.gettempdir()
@@ -18,12 +18,17 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import codecs
+import io
+
 import polib
 
 import lib.polib4us as M
 
 from nose.tools import (
+    assert_equal,
     assert_list_equal,
+    assert_raises,
     assert_true,
 )
 
@@ -55,6 +60,47 @@ msgstr "b"
         M.install_patches()
         t()
 
+    @tools.fork_isolation
+    def test_small_chunks(self):
+        M.install_patches()
+        M.Codecs._chunk_size = 7  # pylint: disable=protected-access
+        s = minimal_header.replace('US-ASCII', 'UTF-8') + '''
+msgid "a"
+msgstr "żółć"
+'''
+        with tools.temporary_file(mode='wt', encoding='UTF-8') as file:
+            file.write(s)
+            file.flush()
+            po = polib.pofile(file.name)
+            assert_equal(po[-1].msgstr, 'żółć')
+
+    @tools.fork_isolation
+    def test_small_chunks_lines(self):
+        s = 'ab\n\nżółć\n' + 'x' * 20 + '\nyz'
+        for chunk_size in range(1, 10):
+            M.Codecs._chunk_size = chunk_size  # pylint: disable=protected-access
+            file = io.BytesIO(s.encode('UTF-8'))
+            decoder = codecs.getincrementaldecoder('UTF-8')()
+            lines = M.Codecs()._iterlines(file, 'UTF-8', decoder)  # pylint: disable=protected-access
+            assert_list_equal(list(lines), s.splitlines(True))
+
+    @tools.fork_isolation
+    def test_small_chunks_decode_error(self):
+        M.install_patches()
+        M.Codecs._chunk_size = 7  # pylint: disable=protected-access
+        s = minimal_header.encode('ASCII') + b'''
+msgid "a"
+msgstr "\xff"
+'''
+        with tools.temporary_file(mode='wb') as file:
+            file.write(s)
+            file.flush()
+            with assert_raises(UnicodeDecodeError) as cm:
+                polib.pofile(file.name)
+            exc = cm.exception
+            assert_equal(exc.object, s)
+            assert_equal(exc.start, s.index(b'\xff'))
+
 @tools.fork_isolation
 def test_flag_splitting():
     M.install_patches()
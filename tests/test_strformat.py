@@ -0,0 +1,96 @@
+# Copyright © 2017 Jakub Wilk <jwilk@jwilk.net>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the “Software”), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from nose.tools import (
+    assert_equal,
+    assert_is,
+    assert_is_instance,
+    assert_is_not,
+    assert_raises,
+)
+
+import lib.strformat.c
+import lib.strformat.pybrace
+import lib.strformat.python
+
+class _test_parse:
+
+    M = None
+    s = None  # string with a directive
+    broken = None  # string with a malformed directive
+    escape = None  # string with an escaped directive character
+    plain_errors = ()  # malformed strings with no directives
+
+    def test_cached(self):
+        M = self.M
+        M.parse.cache_clear()
+        fmt = M.parse(self.s)
+        assert_is_instance(fmt, M.FormatString)
+        assert_is(M.parse(self.s), fmt)
+        info = M.parse.cache_info()
+        assert_equal(info.hits, 1)
+        assert_equal(info.misses, 1)
+
+    def test_error(self):
+        M = self.M
+        M.parse.cache_clear()
+        excs = []
+        for i in range(2):
+            with assert_raises(M.Error) as cm:
+                M.parse(self.broken)
+            excs += [cm.exception]
+        assert_is_not(excs[0], excs[1])
+        assert_is(type(excs[0]), type(excs[1]))
+        assert_equal(excs[0].args, excs[1].args)
+        assert_equal(M.parse.cache_info().hits, 1)
+
+    def test_no_directives(self):
+        M = self.M
+        M.parse.cache_clear()
+        for parse in M.parse, M.parse_uncached:
+            fmt = parse('spam')
+            assert_is(fmt, parse.no_directives)
+            assert_is(parse(''), fmt)
+            assert_is_not(parse(self.escape), fmt)
+            for s in self.plain_errors:
+                with assert_raises(M.Error):
+                    parse(s)
+        assert_equal(M.parse.cache_info().misses, 1 + len(self.plain_errors))
+
+class test_c(_test_parse):
+    M = lib.strformat.c
+    s = '%d'
+    broken = '%'
+    escape = '%%'
+
+class test_python(_test_parse):
+    M = lib.strformat.python
+    s = '%d'
+    broken = '%'
+    escape = '%%'
+
+class test_pybrace(_test_parse):
+    M = lib.strformat.pybrace
+    s = '{0}'
+    broken = '{'
+    escape = '{{'
+    plain_errors = ('}',)
+
+# vim:ts=4 sts=4 sw=4 et
@@ -33,6 +33,7 @@ except ImportError:
 import nose
 from nose.tools import (
     assert_equal,
+    assert_false,
     assert_greater,
     assert_is_instance,
     assert_raises,
@@ -84,6 +85,15 @@ def test_text():
     assert_equal(fmt[2], 'bacon')
     assert_equal(fmt[4], 'spam')
 
+def test_compact():
+    fmt = M.FormatString('%s%*d')
+    assert_false(hasattr(fmt, '__dict__'))
+    assert_is_instance(fmt.arguments, tuple)
+    for args in fmt.arguments:
+        assert_is_instance(args, tuple)
+        for arg in args:
+            assert_false(hasattr(arg, '__dict__'))
+
 class test_types:
 
     def t(self, s, tp, warn_type=None, integer=False):
@@ -32,6 +32,7 @@ except ImportError:
 import nose
 from nose.tools import (
     assert_equal,
+    assert_false,
     assert_is,
     assert_is_instance,
     assert_raises,
@@ -83,6 +84,14 @@ def test_text():
     assert_equal(fmt[2], 'bacon')
     assert_equal(fmt[4], 'spam')
 
+def test_compact():
+    fmt = M.FormatString('{0}{0:{1}}')
+    assert_false(hasattr(fmt, '__dict__'))
+    for args in fmt.argument_map.values():
+        assert_is_instance(args, tuple)
+        for arg in args:
+            assert_false(hasattr(arg, '__dict__'))
+
 class test_types:
 
     def t(self, k, *types):
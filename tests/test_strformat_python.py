@@ -22,6 +22,7 @@ import struct
 
 from nose.tools import (
     assert_equal,
+    assert_false,
     assert_greater,
     assert_is_instance,
     assert_raises,
@@ -58,6 +59,17 @@ def test_text():
     assert_equal(fmt[2], 'bacon')
     assert_equal(fmt[4], 'spam')
 
+def test_compact():
+    fmt = M.FormatString('%s%*d')
+    assert_false(hasattr(fmt, '__dict__'))
+    assert_is_instance(fmt.seq_arguments, tuple)
+    assert_is_instance(fmt.seq_conversions, tuple)
+    for arg in fmt.seq_arguments:
+        assert_false(hasattr(arg, '__dict__'))
+    fmt = M.FormatString('%(eggs)s%(eggs)s')
+    assert_equal(len(fmt.map_arguments['eggs']), 2)
+    assert_is_instance(fmt.map_arguments['eggs'], tuple)
+
 class test_map:
 
     def t(self, key):
@@ -57,6 +57,26 @@ class test_escape:
         s = 'brown fox'
         self.t(s, repr(s))
 
+    def test_lazy(self):
+        calls = []
+        def f(s):
+            calls.append(s)
+            return M.safestr(s)
+        s = M.lazy_safestr(f, 'brown fox')
+        assert_equal(calls, [])
+        self.t(s, 'brown fox')
+        assert_equal(calls, ['brown fox'])
+
+def test_format():
+    tag = M.get_tag('empty-file')
+    assert_equal(tag.get_priority(), 'W')
+    assert_equal(tag.format('eggs.po'), 'W: eggs.po: empty-file')
+    tag = M.get_tag('unknown-header-field')
+    assert_equal(
+        tag.format('eggs.po', 'ham', '=>', 'spam bacon'),
+        "I: eggs.po: unknown-header-field ham => 'spam bacon'"
+    )
+
 def ast_to_tagnames(node):
     for child in ast.iter_child_nodes(node):
         for t in ast_to_tagnames(child):
@@ -41,6 +41,9 @@ class test_well_formed:
     def test_unknown_entity(self):
         self.t('&eggs;')
 
+    def test_text(self):
+        self.t('eggs > ham ]] spam')
+
 class test_malformed:
 
     def t(self, s):
@@ -59,6 +62,12 @@ class test_malformed:
     def test_broken_entity(self):
         self.t('&#eggs;')
 
+    def test_cdata_end(self):
+        self.t('eggs ]]> ham')
+
+    def test_root_element(self):
+        self.t('</{xe}><{xe}>'.format(xe=M._xe))  # pylint: disable=protected-access
+
     def test_entity_def(self):
         s = (
             '<!DOCTYPE spam [<!ENTITY eggs "ham">]>'